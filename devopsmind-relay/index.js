@@ -1,3 +1,6 @@
+const MAX_BODY_BYTES = 65536;
+const MAX_BATCH_ITEMS = 100;
+
 export default {
   async fetch(request, env, ctx) {
     try {
@@ -12,15 +15,14 @@ export default {
         });
       }
 
-      const contentLength = Number(request.headers.get("content-length") || 0);
-      if (contentLength > 65536) {
-        return new Response(JSON.stringify({ error: "Payload too large (max 64 KiB)" }), {
-          status: 413,
-          headers: corsHeaders({ "Content-Type": "application/json" }),
-        });
+      if (new URL(request.url).pathname === "/batch") {
+        return await handleBatch(request, env);
       }
 
-      const body = await request.text();
+      const body = await readBody(request);
+      if (body instanceof Response) {
+        return body;
+      }
       if (!body.trim()) {
         return new Response(JSON.stringify({ ok: false, error: "Empty submission" }), {
           status: 200,
@@ -38,19 +40,7 @@ export default {
         },
       };
 
-      const ghRes = await fetch(
-        "https://api.github.com/repos/InfraForgeLabs/DevOpsMind/dispatches",
-        {
-          method: "POST",
-          headers: {
-            "Authorization": `Bearer ${env.REPO_PAT}`,
-            "Accept": "application/vnd.github+json",
-            "User-Agent": "devopsmind-relay",
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify(payload),
-        }
-      );
+      const ghRes = await dispatch(env, payload);
 
       if (!ghRes.ok) {
         const err = await ghRes.text();
@@ -73,11 +63,127 @@ export default {
   },
 };
 
+// ---------------------------------------------------------
+// POST /batch — many snapshots, one repository_dispatch
+//   Body: NDJSON (one JSON snapshot per line, Content-Type application/x-ndjson)
+//         or multi-document YAML (documents separated by "---" lines).
+//   Reply: { ok, dispatched, acks: [{ index, sha256 }] }, sha256 over each item's text.
+// ---------------------------------------------------------
+async function handleBatch(request, env) {
+  const body = await readBody(request);
+  if (body instanceof Response) {
+    return body;
+  }
+
+  const items = splitItems(body, request.headers.get("content-type") || "");
+  if (!items.length) {
+    return jsonResponse({ ok: false, error: "Empty batch" });
+  }
+  if (items.length > MAX_BATCH_ITEMS) {
+    return jsonResponse({ ok: false, error: `Too many items (max ${MAX_BATCH_ITEMS})` }, 413);
+  }
+
+  const acks = [];
+  for (const [index, text] of items.entries()) {
+    acks.push({ index, sha256: await sha256base16(text) });
+  }
+
+  const ghRes = await dispatch(env, {
+    event_type: "player_submission_batch",
+    client_payload: {
+      items: items.map((yaml, i) => ({ yaml, sha256: acks[i].sha256 })),
+      received_at: new Date().toISOString(),
+    },
+  });
+
+  if (!ghRes.ok) {
+    const err = await ghRes.text();
+    return jsonResponse({ ok: false, error: "GitHub dispatch failed", body: err });
+  }
+  return jsonResponse({ ok: true, dispatched: 1, acks });
+}
+
+// ---------------------------------------------------------
+// Request bodies: plain or Content-Encoding: gzip (advertised via Accept-Encoding
+// on every reply, RFC 7694). The 64 KiB limit applies to the decoded body.
+// Returns the text, or an error Response.
+// ---------------------------------------------------------
+async function readBody(request) {
+  const contentLength = Number(request.headers.get("content-length") || 0);
+  if (contentLength > MAX_BODY_BYTES) {
+    return jsonResponse({ error: "Payload too large (max 64 KiB)" }, 413);
+  }
+
+  const encoding = (request.headers.get("content-encoding") || "identity").toLowerCase();
+  if (encoding === "identity") {
+    return await request.text();
+  }
+  if (encoding !== "gzip" || !request.body) {
+    return jsonResponse({ error: `Unsupported Content-Encoding: ${encoding}` }, 415);
+  }
+
+  const reader = request.body.pipeThrough(new DecompressionStream("gzip")).getReader();
+  const chunks = [];
+  let size = 0;
+  try {
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      size += value.byteLength;
+      if (size > MAX_BODY_BYTES) {
+        await reader.cancel();
+        return jsonResponse({ error: "Payload too large (max 64 KiB)" }, 413);
+      }
+      chunks.push(value);
+    }
+  } catch (err) {
+    return jsonResponse({ ok: false, error: "Invalid gzip body" }, 400);
+  }
+  const bytes = new Uint8Array(size);
+  let offset = 0;
+  for (const c of chunks) {
+    bytes.set(c, offset);
+    offset += c.byteLength;
+  }
+  return new TextDecoder().decode(bytes);
+}
+
+function splitItems(body, contentType) {
+  if (/ndjson|jsonl/i.test(contentType)) {
+    return body.split("\n").map((l) => l.replace(/\r$/, "")).filter((l) => l.trim());
+  }
+  return body
+    .split(/^---[ \t]*\r?$/m)
+    .map((d) => d.replace(/^\r?\n/, "").replace(/\r?\n$/, ""))
+    .filter((d) => d.trim());
+}
+
+function dispatch(env, payload) {
+  return fetch("https://api.github.com/repos/InfraForgeLabs/DevOpsMind/dispatches", {
+    method: "POST",
+    headers: {
+      "Authorization": `Bearer ${env.REPO_PAT}`,
+      "Accept": "application/vnd.github+json",
+      "User-Agent": "devopsmind-relay",
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify(payload),
+  });
+}
+
+function jsonResponse(obj, status = 200) {
+  return new Response(JSON.stringify(obj), {
+    status,
+    headers: corsHeaders({ "Content-Type": "application/json" }),
+  });
+}
+
 function corsHeaders(extra = {}) {
   return {
     "Access-Control-Allow-Origin": "*",
     "Access-Control-Allow-Methods": "POST, OPTIONS",
-    "Access-Control-Allow-Headers": "Content-Type",
+    "Access-Control-Allow-Headers": "Content-Type, Content-Encoding",
+    "Accept-Encoding": "gzip",
     ...extra,
   };
 }
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the devopsmind-relay Worker (index.js), for tests and offline work.
+
+Speaks the same protocol, POST / (one snapshot) and POST /batch (NDJSON or
+multi-document YAML), but instead of calling GitHub's repository_dispatch it
+writes each accepted item to <out>/<sha256>.yaml, as the workflow does, and
+counts dispatches. Like the Worker it accepts Content-Encoding: gzip bodies and
+advertises that with Accept-Encoding on every reply (unless --no-gzip).
+GET /stats reports {"dispatches": n, "items": m, "bytes": wire bytes received}.
+
+    python devopsmind-relay/local_relay.py --port 8787 --out /tmp/submissions
+    DEVOPSMIND_WORKER_URL=http://127.0.0.1:8787 devopsmind submit
+"""
+from __future__ import annotations
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import argparse, gzip, hashlib, json, re, threading, zlib
+from typing import List
+
+MAX_BODY_BYTES = 65536
+MAX_BATCH_ITEMS = 100
+
+
+def split_items(body: str, content_type: str) -> List[str]:
+    """Mirror of splitItems() in index.js."""
+    if re.search(r"ndjson|jsonl", content_type, re.I):
+        return [l[:-1] if l.endswith("\r") else l for l in body.split("\n") if l.strip()]
+    docs = re.split(r"^---[ \t]*\r?$", body, flags=re.M)
+    docs = [re.sub(r"\r?\n$", "", re.sub(r"^\r?\n", "", d)) for d in docs]
+    return [d for d in docs if d.strip()]
+
+
+class Relay:
+    def __init__(self, out: Path, batch: bool = True, gzip: bool = True):
+        self.out = out
+        self.batch = batch
+        self.gzip = gzip
+        self.dispatches = 0
+        self.items = 0
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    def dispatch(self, items: List[str]) -> List[str]:
+        digests = [hashlib.sha256(t.encode()).hexdigest() for t in items]
+        with self.lock:
+            self.out.mkdir(parents=True, exist_ok=True)
+            for text, digest in zip(items, digests):
+                (self.out / f"{digest}.yaml").write_text(text)
+            self.dispatches += 1
+            self.items += len(items)
+        return digests
+
+
+def make_handler(relay: Relay):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, obj, status=200):
+            data = json.dumps(obj).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if relay.gzip:
+                self.send_header("Accept-Encoding", "gzip")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                return self._reply({"dispatches": relay.dispatches, "items": relay.items, "bytes": relay.bytes})
+            self._reply({"error": "Method not allowed"}, 405)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length)
+            with relay.lock:
+                relay.bytes += length
+            if length > MAX_BODY_BYTES:
+                return self._reply({"error": "Payload too large (max 64 KiB)"}, 413)
+
+            encoding = (self.headers.get("Content-Encoding") or "identity").lower()
+            if encoding == "gzip" and relay.gzip:
+                try:
+                    raw = gzip.decompress(raw)
+                except (OSError, EOFError, zlib.error):
+                    return self._reply({"ok": False, "error": "Invalid gzip body"}, 400)
+                if len(raw) > MAX_BODY_BYTES:
+                    return self._reply({"error": "Payload too large (max 64 KiB)"}, 413)
+            elif encoding != "identity":
+                return self._reply({"error": f"Unsupported Content-Encoding: {encoding}"}, 415)
+            body = raw.decode("utf-8", errors="replace")
+
+            if self.path == "/batch" and relay.batch:
+                items = split_items(body, self.headers.get("Content-Type", ""))
+                if not items:
+                    return self._reply({"ok": False, "error": "Empty batch"})
+                if len(items) > MAX_BATCH_ITEMS:
+                    return self._reply({"ok": False, "error": f"Too many items (max {MAX_BATCH_ITEMS})"}, 413)
+                digests = relay.dispatch(items)
+                return self._reply({
+                    "ok": True,
+                    "dispatched": 1,
+                    "acks": [{"index": i, "sha256": d} for i, d in enumerate(digests)],
+                })
+
+            # Any other path, and /batch on a relay without it (like the legacy
+            # Worker): the whole body is one submission, answered without acks
+            if not body.strip():
+                return self._reply({"ok": False, "error": "Empty submission"})
+            return self._reply({"ok": True, "sha256": relay.dispatch([body])[0]})
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def serve(port: int, out: Path, batch: bool = True, gzip: bool = True) -> ThreadingHTTPServer:
+    """Start the relay on 127.0.0.1:<port> in a background thread and return the server."""
+    relay = Relay(out, batch, gzip)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(relay))
+    server.relay = relay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local stand-in for the devopsmind relay worker")
+    ap.add_argument("--port", type=int, default=8787)
+    ap.add_argument("--out", default="relay-submissions", help="Where accepted items are written")
+    ap.add_argument("--no-batch", action="store_true", help="Behave like the legacy relay: /batch is taken as one plain submission")
+    ap.add_argument("--no-gzip", action="store_true", help="Neither advertise nor accept gzip bodies (415)")
+    args = ap.parse_args()
+
+    relay = Relay(Path(args.out), not args.no_batch, not args.no_gzip)
+    srv = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(relay))
+    print(f"devopsmind local relay on http://127.0.0.1:{args.port} → {args.out}", flush=True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
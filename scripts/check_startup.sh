@@ -0,0 +1,41 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Startup-time budget for the `devopsmind` entry point.
+# Importing the entry point (argument parsing + daemon forwarding) must stay
+# under BUDGET_MS and must not pull in rich / yaml / requests / hcl2.
+
+BUDGET_MS="${DEVOPSMIND_STARTUP_BUDGET_MS:-25}"
+PYTHON="${PYTHON:-python3}"
+
+echo "⏱️  Checking devopsmind import budget (${BUDGET_MS} ms)..."
+
+report="$("${PYTHON}" -X importtime -c "import devopsmind.__main__, devopsmind.daemon" 2>&1 >/dev/null)"
+
+heavy="$(echo "${report}" | awk -F'|' '{gsub(/^ +| +$/, "", $3); print $3}' \
+  | grep -E '^(rich|yaml|requests|hcl2)(\.|$)' || true)"
+if [ -n "${heavy}" ]; then
+  echo "❌ Heavy modules imported at startup:"
+  echo "${heavy}" | sed 's/^/   - /'
+  exit 1
+fi
+
+# Sum the cumulative time of every top-level devopsmind import (microseconds).
+# Take the best of RUNS so one noisy sample on a busy machine doesn't fail the check.
+RUNS="${DEVOPSMIND_STARTUP_RUNS:-3}"
+total_ms=""
+for _ in $(seq "${RUNS}"); do
+  report="$("${PYTHON}" -X importtime -c "import devopsmind.__main__, devopsmind.daemon" 2>&1 >/dev/null)"
+  us="$(echo "${report}" | awk -F'|' '$3 ~ /^ devopsmind/ {gsub(/ /, "", $2); sum += $2} END {print sum + 0}')"
+  ms=$(( us / 1000 ))
+  if [ -z "${total_ms}" ] || [ "${ms}" -lt "${total_ms}" ]; then
+    total_ms="${ms}"
+  fi
+done
+
+echo "   devopsmind entry point: ${total_ms} ms"
+if [ "${total_ms}" -gt "${BUDGET_MS}" ]; then
+  echo "❌ Startup budget exceeded (${total_ms} ms > ${BUDGET_MS} ms)."
+  exit 1
+fi
+echo "✅ Within budget."
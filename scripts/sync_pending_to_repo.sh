@@ -2,11 +2,12 @@
 set -e
 
 # 🧠 DevOpsMind pending sync uploader
-# Copies local pending YAMLs into repo and pushes to main.
+# Exports the local sync queue into the leaderboard branch and pushes it,
+# for when the relay is unreachable. The build workflow picks them up.
 
 REPO_DIR="$HOME/DevOpsMind"         # path to your repo clone
-LOCAL_PENDING="$HOME/.devopsmind/.pending_sync"
-REMOTE_PENDING="$REPO_DIR/.pending_sync"
+PYTHON="${PYTHON:-python3}"
+SUBMISSIONS="$REPO_DIR/leaderboard/submissions"
 
 echo "🧩 Syncing pending leaderboard entries..."
 
@@ -17,28 +18,24 @@ if [ ! -d "$REPO_DIR/.git" ]; then
 fi
 
 cd "$REPO_DIR"
+git checkout leaderboard
+git pull --rebase origin leaderboard
 
-# Ensure .pending_sync exists
-mkdir -p "$REMOTE_PENDING"
-
-# Copy all pending YAMLs into the repo
-if [ -d "$LOCAL_PENDING" ] && ls "$LOCAL_PENDING"/*.yaml >/dev/null 2>&1; then
-  cp "$LOCAL_PENDING"/*.yaml "$REMOTE_PENDING"/
-  echo "✅ Copied new entries:"
-  ls "$REMOTE_PENDING"/*.yaml
-else
-  echo "⚠️  No new pending YAMLs found."
+# Export pending snapshots (the same files the relay would have stored)
+EXPORTED=$("$PYTHON" -m devopsmind.syncqueue --export "$SUBMISSIONS")
+if [ -z "$EXPORTED" ]; then
+  echo "⚠️  No pending snapshots found."
   exit 0
 fi
+echo "✅ Exported new entries:"
+echo "$EXPORTED"
 
-# Stage and push to main
-git checkout main
-git pull origin main
-git add .pending_sync/*.yaml || true
+# Stage and push to the leaderboard branch
+git add leaderboard/submissions
 if git diff --cached --quiet; then
   echo "✅ No new changes to push."
 else
   git commit -m "sync: push pending leaderboard updates"
-  git push origin main
-  echo "🚀 Pending updates pushed to GitHub (main branch)."
+  git push origin leaderboard
+  echo "🚀 Pending updates pushed to GitHub (leaderboard branch)."
 fi
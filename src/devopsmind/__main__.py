@@ -1,274 +1,18 @@
-from pathlib import Path
-import argparse, json, sys, requests, yaml, os
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.markdown import Markdown
-from rich import box
-from rich.prompt import Prompt
+from __future__ import annotations
+import sys  # argparse / json are imported after the daemon probe in main()
 
-from .engine import play, stats
-from .profiles import (
-    create as profile_create,
-    login as profile_login,
-    list_profiles,
-    current_profile_name,
-    load_state,
-)
-from .sync import sync_default
-from .submit import submit_pending
-from .constants import VERSION
-
-console = Console()
-PROFILE_CREATED = False
-
-
-# ---------------------------------------------------------
-# Profile Setup
-# ---------------------------------------------------------
-def ensure_profile():
-    global PROFILE_CREATED
-    if PROFILE_CREATED:
-        return False
-
-    state = load_state()
-    player = state.get("player", {})
-
-    if player.get("email") and player.get("gamer"):
-        return False
-
-    console.print(Panel.fit("🧠 Let's set up your DevOpsMind profile!", border_style="cyan"))
-    name = Prompt.ask("👤 Enter username").strip() or "player"
-    gamer = Prompt.ask("🎮 Choose your gamer tag (nickname)").strip() or name
-    email = Prompt.ask("📧 Enter your email (for XP sync / recovery)").strip()
-
-    profile_create(name)
-    profile_file = Path.home() / ".devopsmind" / "profiles" / f"{name}.yaml"
-    if profile_file.exists():
-        data = yaml.safe_load(profile_file.read_text())
-        data["player"]["gamer"] = gamer
-        data["player"]["email"] = email
-        profile_file.write_text(yaml.safe_dump(data))
-
-    console.print(Panel.fit(f"✅ Profile '{name}' ({gamer}) created!", border_style="green"))
-    PROFILE_CREATED = True
-    return True
-
-
-# ---------------------------------------------------------
-# Header
-# ---------------------------------------------------------
-def show_header(show_banner=True):
-    st = load_state()
-    player = st.get("player", {})
-    name = player.get("name", "default")
-    email = player.get("email", "")
-    xp = player.get("xp", 0)
-    rank = player.get("rank", "Beginner")
-
-    if show_banner:
-        console.print("\n╭──────────────────────────╮")
-        console.print(f"│ DevOpsMind v{VERSION} Ready! │")
-        console.print("╰──────────────────────────╯")
-
-    console.print(f"👤 Profile: {name} ({email})  |  🧠 XP: {xp}  |  🏅 Rank: {rank}\n")
-
-
-# ---------------------------------------------------------
-# List Challenges
 # ---------------------------------------------------------
-def cmd_list(stack: str | None = None):
-    show_header()
-    registry_path = Path.home() / ".devopsmind" / "challenges.json"
-    if not registry_path.exists():
-        console.print("[yellow]⚠️ No registry found. Run:[/yellow] [cyan]devopsmind sync[/cyan]")
-        return
-
-    data = json.loads(registry_path.read_text())
-    challenges = data.get("challenges", [])
-
-    if stack:
-        challenges = [c for c in challenges if c["category"].lower() == stack.lower()]
-        if not challenges:
-            console.print(f"[red]❌ No challenges found for stack '{stack}'.[/red]")
-            return
-        _print_stack_table(stack, challenges)
-        console.print(f"\nTotal: {len(challenges)} | Profile: {current_profile_name()}")
-        return
-
-    categories = {}
-    for c in challenges:
-        cat = c.get("category", "misc")
-        categories.setdefault(cat, []).append(c)
-
-    console.print()
-    for i, cat in enumerate(sorted(categories.keys()), 1):
-        clean_cat = cat.split("-", 1)[-1] if "-" in cat else cat
-        console.print(f"{i:02d}-{clean_cat} Track ({len(categories[cat])} challenges)")
-    console.print()
-    console.print("💡 Tip:")
-    console.print("   👉 Run [cyan]devopsmind --stack docker[/cyan] to explore a specific stack.")
-    console.print("   🔄 Run [cyan]devopsmind sync[/cyan] to fetch new challenges.")
-
-
-def _print_stack_table(cat, items):
-    from .profiles import load_state
-    state = load_state()
-    completed = set(state.get("progress", {}).get("completed", []))
-
-    clean_cat = cat.split("-", 1)[-1] if "-" in cat else cat
-    table = Table(title=f"{clean_cat} Track ({len(items)} challenges)", box=box.SIMPLE_HEAVY)
-    table.add_column("ID", style="cyan")
-    table.add_column("Title", style="green")
-    table.add_column("Diff", justify="center")
-    table.add_column("XP", justify="right")
-    table.add_column("Status", style="magenta")
-
-    for c in sorted(items, key=lambda x: x["id"]):
-        diff = c.get("difficulty", "?").lower()
-        diff_icon = {"easy": "🧩 easy", "medium": "⚙️ medium", "hard": "💀 hard"}.get(diff, diff)
-        status = "[green]✅ Done[/green]" if c["id"] in completed else "[red]❌ Pending[/red]"
-        table.add_row(c["id"], c["title"], diff_icon, str(c["xp"]), status)
-
-    console.print(table)
-
-
+# Constants
 # ---------------------------------------------------------
-# Stats
-# ---------------------------------------------------------
-def cmd_stats():
-    show_header()
-    s = stats()
-    table = Table(title="🏆 Player Stats", box=box.ROUNDED)
-    table.add_column("XP", justify="center")
-    table.add_column("Rank", justify="center")
-    table.add_column("Completed", justify="center")
-    table.add_row(str(s["xp"]), s["rank"], str(s["completed_count"]))
-    console.print(table)
-
-
-# ---------------------------------------------------------
-# Hints & Descriptions
-# ---------------------------------------------------------
-def cmd_hint(ch_id: str):
-    from .engine import discover
-    show_header()
-    challenges = discover()
-    ch = next((c for c in challenges if c.id == ch_id), None)
-    if not ch:
-        console.print(f"[red]❌ Challenge not found: {ch_id}[/red]")
-        return
-    console.print(Panel.fit(ch.hint or "No hint provided.", border_style="cyan"))
-
-
-def cmd_describe(ch_id: str):
-    from .engine import discover
-    show_header(show_banner=False)
-    challenges = discover()
-    ch = next((c for c in challenges if c.id == ch_id), None)
-    if not ch:
-        console.print(f"[red]❌ Challenge not found: {ch_id}[/red]")
-        return
-
-    workspace = Path.home() / "DevOpsMind" / "workspace" / ch.id
-    meta_panel = Panel.fit(
-        f"🧩 [bold cyan]Challenge:[/bold cyan] {ch.id}\n"
-        f"📦 [bold yellow]Difficulty:[/bold yellow] {getattr(ch, 'difficulty', 'unknown')} "
-        f"| 🧠 [bold green]XP:[/bold green] {getattr(ch, 'xp', '?')}\n"
-        f"📂 [bold blue]Workspace:[/bold blue] {workspace}",
-        border_style="blue",
-    )
-    console.print(meta_panel)
-
-    possible_dirs = [ch.path]
-    base_dir = Path.home() / ".devopsmind" / "challenges"
-    for root, dirs, files in os.walk(base_dir):
-        if ch_id in root:
-            possible_dirs.append(Path(root))
-
-    for d in possible_dirs:
-        for candidate in ["description.md", "DESCRIPTION.md", "README.md"]:
-            desc_file = d / candidate
-            if desc_file.exists():
-                text = desc_file.read_text(encoding="utf-8").strip()
-                console.print(Panel(Markdown(text), border_style="cyan"))
-                return
-
-    console.print(f"[yellow]⚠️ No description file found for {ch_id}.[/yellow]")
-
-
-# ---------------------------------------------------------
-# Leaderboard (Fixed + Robust)
-# ---------------------------------------------------------
-def cmd_leaderboard():
-    show_header()
-    console.print(Panel.fit("🏆 Global Leaderboard", border_style="blue"))
-
-    urls = [
-        "https://raw.githubusercontent.com/InfraForgeLabs/DevOpsMind/leaderboard/leaderboard.json",
-        "https://raw.githubusercontent.com/InfraForgeLabs/DevOpsMind/leaderboard/leaderboard/leaderboard.json",
-    ]
-    override = os.getenv("DEVOPSMIND_LEADERBOARD_URL")
-    if override:
-        urls.insert(0, override)
-
-    data = None
-    used_url = None
-
-    for u in urls:
-        try:
-            resp = requests.get(u, timeout=10)
-            if resp.status_code == 200:
-                parsed = resp.json()
-                if isinstance(parsed, dict) and "players" in parsed:
-                    data = parsed["players"]
-                elif isinstance(parsed, list):
-                    data = parsed
-                if data:
-                    used_url = u
-                    break
-        except Exception:
-            continue
-
-    if not isinstance(data, list) or not data:
-        console.print("[yellow]⚠️ Could not load leaderboard data (network/cache issue).[/yellow]")
-        console.print("[dim]Try again in a few seconds or check your connection.[/dim]")
-        return
-
-    console.print(f"[dim]📡 Loaded leaderboard from {used_url}[/dim]\n")
-
-    data = [x for x in data if isinstance(x, dict)]
-
-    def safe_xp(entry):
-        try:
-            return int(entry.get("xp", entry.get("score", 0)) or 0)
-        except Exception:
-            return 0
-
-    data = sorted(data, key=safe_xp, reverse=True)
-
-    table = Table(title="🌐 Global Leaderboard", box=box.SIMPLE_HEAVY)
-    table.add_column("Rank", justify="center")
-    table.add_column("Gamer Tag", style="cyan")
-    table.add_column("XP", justify="right", style="green")
-    table.add_column("Rank Title", style="magenta")
-
-    for i, entry in enumerate(data, 1):
-        table.add_row(
-            str(i),
-            str(entry.get("gamer", "?")),
-            str(entry.get("xp", entry.get("score", 0))),
-            str(entry.get("rank", "-")),
-        )
-
-    console.print(table)
+NO_SETUP = {"list", "grade", "describe", "hint", "daemon"}  # never prompt for a profile
 
 
 # ---------------------------------------------------------
 # Main Entrypoint
 # ---------------------------------------------------------
-def main():
-    ensure_profile()
+def build_parser() -> argparse.ArgumentParser:
+    import argparse
+
     parser = argparse.ArgumentParser(prog="devopsmind", description="DevOpsMind — Gamified DevOps Simulator")
     parser.add_argument("--stack", help="Filter challenges by stack", default=None)
     sub = parser.add_subparsers(dest="cmd", required=False)
@@ -276,15 +20,43 @@ def main():
     sub.add_parser("list", help="List challenges")
     play_cmd = sub.add_parser("play", help="Play a challenge")
     play_cmd.add_argument("id")
+    play_cmd.add_argument("--sandbox", action="store_true", help="Run the validator in a time/memory-limited child process")
+    play_cmd.add_argument("--no-cache", action="store_true", help="Always re-run the validator")
 
     val_cmd = sub.add_parser("validate", help="Validate a challenge")
-    val_cmd.add_argument("id")
+    val_cmd.add_argument("id", nargs="?")
     val_cmd.add_argument("--context", default="{}")
+    val_cmd.add_argument("--sandbox", action="store_true", help="Run validators in time/memory-limited child processes")
+    val_cmd.add_argument("--no-cache", action="store_true", help="Always re-run validators")
+    val_cmd.add_argument("--all", action="store_true", help="Validate every challenge in parallel")
+    val_cmd.add_argument("--stack", default=argparse.SUPPRESS, help="With --all: only this stack")
+    val_cmd.add_argument("--difficulty", choices=["easy", "medium", "hard"], help="With --all: only this tier")
+    val_cmd.add_argument("-j", "--jobs", type=int, default=None, help="With --all: worker processes")
+
+    watch_cmd = sub.add_parser("watch", help="Re-validate a challenge whenever its workspace changes")
+    watch_cmd.add_argument("id")
+    watch_cmd.add_argument("--context", default="{}")
+    watch_cmd.add_argument("--sandbox", action="store_true", help="Run the validator in a time/memory-limited child process")
+    watch_cmd.add_argument("--poll", action="store_true", help="Use stat polling instead of inotify")
+    watch_cmd.add_argument("--debounce-ms", type=int, default=300, help="Quiet period before re-validating")
+
+    grade_cmd = sub.add_parser("grade", help="Grade one challenge across many learner workspaces")
+    grade_cmd.add_argument("id")
+    grade_cmd.add_argument("workspaces", nargs="+", help="Workspace directories or globs")
+    grade_cmd.add_argument("--context", default="{}")
+    grade_cmd.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes")
+    grade_cmd.add_argument("--jsonl", help="Write JSONL results to this file ('-' for stdout)")
+    grade_cmd.add_argument("--junit", help="Write JUnit XML results to this file")
+    grade_cmd.add_argument("--refresh", action="store_true",
+                           help="Restore challenge files in each workspace first (overwrites learner edits)")
+    grade_cmd.add_argument("--sandbox", action="store_true", help="Run validators in time/memory-limited child processes")
 
     sub.add_parser("stats", help="Show player stats")
     sub.add_parser("leaderboard", help="Show leaderboard")
     sub.add_parser("sync", help="Sync challenges")
-    sub.add_parser("submit", help="Submit pending progress to leaderboard")
+    submit_cmd = sub.add_parser("submit", help="Submit pending progress to leaderboard")
+    submit_cmd.add_argument("--force", action="store_true",
+                            help="Re-send full snapshots of every profile, even if already delivered")
     sub.add_parser("doctor", help="Run diagnostics")
 
     hint = sub.add_parser("hint", help="Show challenge hint")
@@ -300,8 +72,17 @@ def main():
     pl.add_argument("name")
     prof_sub.add_parser("list", help="List profiles")
 
-    args = parser.parse_args()
-    if len(sys.argv) == 1:
+    dmn = sub.add_parser("daemon", help="Manage the background daemon that keeps commands warm")
+    dmn.add_argument("action", choices=["start", "stop", "status", "run"])
+    return parser
+
+
+def dispatch(parser: argparse.ArgumentParser, args: argparse.Namespace, argv: list):
+    """Run a parsed command; each branch imports only the modules it needs."""
+    import json
+    from .commands import console, show_header, cmd_list
+
+    if not argv:
         cmd_list()
         return
     if args.stack and not args.cmd:
@@ -312,36 +93,72 @@ def main():
     if cmd == "list":
         cmd_list(args.stack)
     elif cmd == "play":
+        from .engine import play
+        from .submit import submit_in_background
         show_header()
-        success = play(args.id, {})
+        success = play(args.id, {}, sandbox=args.sandbox, use_cache=not args.no_cache)
         if success:
             console.print("\n🏆 Challenge completed successfully! Syncing leaderboard...\n")
-            submit_pending()
+            submit_in_background()
+    elif cmd == "validate" and args.all:
+        from .batch import validate_all
+        show_header()
+        results = validate_all(args.stack, args.difficulty, args.jobs, json.loads(args.context), args.sandbox,
+                               use_cache=not args.no_cache)
+        if not results or not all(ok for _, ok, _ in results):
+            sys.exit(1)
     elif cmd == "validate":
+        from .engine import play
+        from .submit import submit_in_background
+        if not args.id:
+            parser.error("validate: provide a challenge id or --all")
         show_header()
-        success = play(args.id, json.loads(args.context))
+        success = play(args.id, json.loads(args.context), sandbox=args.sandbox,
+                       use_cache=not args.no_cache)
         if success:
             console.print("\n🏆 Challenge completed successfully! Syncing leaderboard...\n")
-            submit_pending()
+            submit_in_background()
+    elif cmd == "watch":
+        from .watch import watch
+        show_header()
+        watch(args.id, json.loads(args.context), sandbox=args.sandbox,
+              debounce_ms=args.debounce_ms, polling=args.poll)
+    elif cmd == "grade":
+        from .batch import grade
+        results = grade(args.id, args.workspaces, args.jobs, json.loads(args.context),
+                        refresh=args.refresh, jsonl=args.jsonl, junit=args.junit,
+                        sandbox=args.sandbox)
+        if not results or not all(r["ok"] for r in results):
+            sys.exit(1)
     elif cmd == "stats":
+        from .commands import cmd_stats
         cmd_stats()
     elif cmd == "leaderboard":
+        from .commands import cmd_leaderboard
         cmd_leaderboard()
     elif cmd == "sync":
+        from .sync import sync_default
         show_header()
         sync_default()
     elif cmd == "submit":
+        from .profiles import apply_resync
+        from .submit import submit_pending
         show_header()
-        submit_pending()
+        if not args.force:
+            apply_resync()
+        submit_pending(force=args.force)
     elif cmd == "doctor":
         show_header()
         from .doctor import run_doctor
         run_doctor()
     elif cmd == "hint":
+        from .commands import cmd_hint
         cmd_hint(args.id)
     elif cmd == "describe":
+        from .commands import cmd_describe
         cmd_describe(args.id)
     elif cmd == "profile":
+        from .profiles import create as profile_create, login as profile_login, list_profiles
         show_header()
         if args.pcmd == "create":
             profile_create(args.name)
@@ -349,3 +166,28 @@ def main():
             profile_login(args.name)
         elif args.pcmd == "list":
             list_profiles()
+    elif cmd == "daemon":
+        from . import daemon
+        daemon.control(args.action)
+
+
+def main():
+    argv = sys.argv[1:]
+    from .daemon import forward
+    code = forward(argv)
+    if code is not None:
+        sys.exit(code)
+
+    # Parse first so --help / usage errors never touch the profile
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # First-run setup is interactive; read-only and CI commands don't need a profile
+    if not (args.cmd in NO_SETUP or not args.cmd or (args.cmd == "validate" and args.all)):
+        from .commands import ensure_profile
+        ensure_profile()
+    dispatch(parser, args, argv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+from __future__ import annotations
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree as ET
+import contextlib, glob, io, json, os, sys, time
+from typing import Dict, Any, List, Tuple
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+from .engine import (
+    WORKSPACE_ROOT,
+    discover,
+    get_challenge,
+    refresh_workspace,
+    validate_in,
+    _load_validator,
+    _log_session,
+)
+from .index import match_stack
+from .progress import record_completion
+
+console = Console()
+
+
+# ---------------------------------------------------------
+# Worker (runs in a pool process, so chdir is per-worker)
+# ---------------------------------------------------------
+def _validate_one(ch_id: str, context: Dict[str, Any] | None, sandbox: bool = False,
+                  use_cache: bool = True) -> Tuple[str, bool, str]:
+    ch = get_challenge(ch_id)
+    if not ch:
+        return ch_id, False, "Challenge not found."
+
+    try:
+        mod = None if sandbox else _load_validator(ch.path)
+    except Exception as e:
+        return ch_id, False, f"Validator failed to load: {e}"
+    if not (ch.path / "validator.py").exists() or not (sandbox or mod):
+        return ch_id, False, "Validator missing."
+
+    workspace_dir = WORKSPACE_ROOT / ch.id
+    workspace_dir.mkdir(parents=True, exist_ok=True)
+
+    # Keep validator / copier chatter out of the batch summary
+    with contextlib.redirect_stdout(io.StringIO()):
+        if ch.path.exists():
+            refresh_workspace(ch.path, workspace_dir, ch.readonly)
+        ok, msg = validate_in(ch, mod, workspace_dir, context, sandbox, use_cache)
+    return ch_id, bool(ok), str(msg)
+
+
+# ---------------------------------------------------------
+# Batch Validation
+# ---------------------------------------------------------
+def select(stack: str | None = None, difficulty: str | None = None) -> List[Any]:
+    """Return discovered challenges matching the stack / difficulty filters."""
+    selected = []
+    for ch in discover():
+        if stack and not match_stack(ch.path.parent.name, stack):
+            continue
+        if difficulty and ch.difficulty != difficulty.lower():
+            continue
+        selected.append(ch)
+    return selected
+
+
+def validate_all(
+    stack: str | None = None,
+    difficulty: str | None = None,
+    jobs: int | None = None,
+    context: Dict[str, Any] | None = None,
+    sandbox: bool = False,
+    use_cache: bool = True,
+) -> List[Tuple[str, bool, str]]:
+    """
+    Validate every matching challenge in a process pool and print one summary.
+    Completions are recorded afterwards in this process, one at a time.
+    """
+    challenges = select(stack, difficulty)
+    if not challenges:
+        console.print("[yellow]⚠️ No challenges match the given filters.[/yellow]")
+        return []
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(challenges)))
+    console.print(f"🧪 Validating {len(challenges)} challenge(s) with {jobs} worker(s)...")
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_validate_one, ch.id, context, sandbox, use_cache) for ch in challenges]
+        results = []
+        for ch, fut in zip(challenges, futures):
+            try:
+                results.append(fut.result())
+            except Exception as e:
+                results.append((ch.id, False, f"Worker crashed: {e}"))
+
+    by_id = {ch.id: ch for ch in challenges}
+    for ch_id, ok, msg in results:
+        ch = by_id[ch_id]
+        _log_session(ch_id, msg, ok, ch.xp if ok else 0)
+        if ok:
+            record_completion(ch_id, ch.xp)
+
+    print_summary(results)
+    return results
+
+
+def print_summary(results: List[Tuple[str, bool, str]], title: str = "🧪 Batch Validation", label: str = "ID",
+                  out: Console | None = None):
+    out = out or console
+    table = Table(title=title, box=box.SIMPLE_HEAVY)
+    table.add_column(label, style="cyan")
+    table.add_column("Result", justify="center")
+    table.add_column("Message")
+
+    for ch_id, ok, msg in results:
+        table.add_row(ch_id, "[green]✅ Pass[/green]" if ok else "[red]❌ Fail[/red]", msg)
+
+    passed = sum(1 for _, ok, _ in results if ok)
+    out.print(table)
+    out.print(f"Passed: {passed}/{len(results)}")
+
+
+# ---------------------------------------------------------
+# Bulk Grading (one challenge, many learner workspaces)
+# ---------------------------------------------------------
+_grader: Dict[str, Any] = {}
+
+
+def _init_grader(ch_id: str, sandbox: bool):
+    """Pool initializer: resolve the challenge and load its validator once per worker."""
+    ch = get_challenge(ch_id)
+    _grader["ch"] = ch
+    _grader["sandbox"] = sandbox
+    _grader["error"] = None
+    try:
+        _grader["mod"] = None if sandbox else _load_validator(ch.path)
+    except Exception as e:
+        _grader["mod"], _grader["error"] = None, f"Validator failed to load: {e}"
+
+
+def _grade_one(workspace: str, context: Dict[str, Any] | None, refresh: bool) -> Dict[str, Any]:
+    ch, mod, sandbox = _grader["ch"], _grader["mod"], _grader["sandbox"]
+    ws = Path(workspace)
+    if _grader["error"]:
+        return _errored(ch.id, ws, _grader["error"])
+    start = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if refresh and ch.path.exists():
+            refresh_workspace(ch.path, ws, ch.readonly)
+        ok, msg = validate_in(ch, mod, ws, context, sandbox, use_cache=False)  # never fill the cache per learner
+    return {
+        "challenge": ch.id,
+        "workspace": str(ws),
+        "ok": bool(ok),
+        "message": str(msg),
+        "duration_s": round(time.monotonic() - start, 3),
+    }
+
+
+def _errored(ch_id: str, ws: Path, msg: str) -> Dict[str, Any]:
+    return {"challenge": ch_id, "workspace": str(ws), "ok": False, "message": msg, "duration_s": 0.0}
+
+
+def expand_workspaces(patterns: List[str]) -> List[Path]:
+    """Expand workspace paths / globs into a sorted, de-duplicated list of directories."""
+    found = set()
+    for pat in patterns:
+        matches = glob.glob(os.path.expanduser(pat), recursive=True) or [pat]
+        found.update(Path(m).resolve() for m in matches if Path(m).is_dir())
+    return sorted(found)
+
+
+def write_jsonl(results: List[Dict[str, Any]], dest: str):
+    lines = "".join(json.dumps(r) + "\n" for r in results)
+    if dest == "-":
+        sys.stdout.write(lines)
+    else:
+        Path(dest).write_text(lines)
+
+
+def write_junit(results: List[Dict[str, Any]], dest: str, suite: str):
+    failures = sum(1 for r in results if not r["ok"])
+    ts = ET.Element(
+        "testsuite",
+        name=suite,
+        tests=str(len(results)),
+        failures=str(failures),
+        time=f"{sum(r['duration_s'] for r in results):.3f}",
+    )
+    for r in results:
+        tc = ET.SubElement(ts, "testcase", classname=suite, name=r["workspace"], time=f"{r['duration_s']:.3f}")
+        if not r["ok"]:
+            ET.SubElement(tc, "failure", message=r["message"]).text = r["message"]
+    ET.ElementTree(ts).write(dest, encoding="utf-8", xml_declaration=True)
+
+
+def grade(
+    ch_id: str,
+    workspaces: List[str],
+    jobs: int | None = None,
+    context: Dict[str, Any] | None = None,
+    refresh: bool = False,
+    jsonl: str | None = None,
+    junit: str | None = None,
+    sandbox: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Validate one challenge against many learner workspaces concurrently.
+    Workspaces are only read unless refresh=True restores the challenge files
+    first. Nothing is recorded to the local profile; results go to the summary,
+    and optionally to JSONL / JUnit XML files (with jsonl="-" the summary goes
+    to stderr so stdout stays pure JSONL).
+    """
+    out = Console(stderr=True) if jsonl == "-" else console
+    ch = get_challenge(ch_id)
+    if not ch:
+        out.print(f"[red]❌ Challenge not found: {ch_id}[/red]")
+        return []
+    load_error = None
+    try:
+        mod = _load_validator(ch.path)
+    except Exception as e:
+        mod, load_error = None, f"Validator failed to load: {e}"
+    if not mod and not load_error:
+        out.print(f"[red]❌ Validator missing for {ch.id}[/red]")
+        return []
+
+    dirs = expand_workspaces(workspaces)
+    if not dirs:
+        out.print("[yellow]⚠️ No workspace directories matched.[/yellow]")
+        return []
+
+    if load_error:
+        # Every workspace errors the same way; still report each one
+        out.print(f"[red]❌ {ch.id}: {load_error}[/red]")
+        results = [_errored(ch.id, d, load_error) for d in dirs]
+    else:
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(dirs)))
+        out.print(f"🧑‍🏫 Grading {ch.id} across {len(dirs)} workspace(s) with {jobs} worker(s)...")
+
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_grader, initargs=(ch.id, sandbox)) as pool:
+            futures = [pool.submit(_grade_one, str(d), context, refresh) for d in dirs]
+            results = []
+            for d, fut in zip(dirs, futures):
+                try:
+                    results.append(fut.result())
+                except Exception as e:
+                    results.append(_errored(ch.id, d, f"Worker crashed: {e}"))
+
+    if jsonl:
+        write_jsonl(results, jsonl)
+    if junit:
+        write_junit(results, junit, ch.id)
+
+    print_summary([(r["workspace"], r["ok"], r["message"]) for r in results],
+                  title=f"🧑‍🏫 Grading: {ch.id}", label="Workspace", out=out)
+    return results
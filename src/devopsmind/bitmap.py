@@ -0,0 +1,134 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Tuple
+
+# ---------------------------------------------------------
+# Ordinal Registry
+# ---------------------------------------------------------
+REGISTRY_FILE = Path(__file__).resolve().parent / "ordinals.txt"
+_registry: Tuple[Dict[str, int], List[str]] | None = None
+
+
+def registry() -> Tuple[Dict[str, int], List[str]]:
+    """Return (id -> ordinal, ordinal -> id) from the append-only ordinals.txt."""
+    global _registry
+    if _registry is None:
+        try:
+            lines = REGISTRY_FILE.read_text().splitlines()
+        except OSError:
+            lines = []
+        ids = [l.strip() for l in lines if l.strip() and not l.startswith("#")]
+        _registry = ({ch_id: i for i, ch_id in enumerate(ids)}, ids)
+    return _registry
+
+
+def popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+
+def mask(ids: Iterable[str]) -> int:
+    """Bitmask of the given ids (ids outside the registry are ignored)."""
+    ordinals = registry()[0]
+    m = 0
+    for ch_id in ids:
+        o = ordinals.get(ch_id)
+        if o is not None:
+            m |= 1 << o
+    return m
+
+
+# ---------------------------------------------------------
+# Completion Set
+# ---------------------------------------------------------
+class CompletionSet:
+    """
+    Completed challenge ids as a bitmap over the ordinal registry.
+    Ids the registry does not know (local custom challenges) live in `extra`.
+    """
+
+    __slots__ = ("bits", "extra")
+
+    def __init__(self, bits: int = 0, extra: Iterable[str] = ()):
+        self.bits = bits
+        self.extra = set(extra)
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[str]) -> "CompletionSet":
+        s = cls()
+        for ch_id in ids:
+            s.add(ch_id)
+        return s
+
+    @classmethod
+    def decode(cls, hex_bits: str | None, extra: Iterable[str] = ()) -> "CompletionSet":
+        return cls(int(hex_bits or "0", 16), extra)
+
+    def encode(self) -> str:
+        return format(self.bits, "x")
+
+    def add(self, ch_id: str) -> bool:
+        """Add an id; returns False if it was already present."""
+        o = registry()[0].get(ch_id)
+        if o is None:
+            if ch_id in self.extra:
+                return False
+            self.extra.add(ch_id)
+            return True
+        if self.bits >> o & 1:
+            return False
+        self.bits |= 1 << o
+        return True
+
+    def count(self, m: int) -> int:
+        """How many completed ids fall inside mask m (e.g. one stack)."""
+        return popcount(self.bits & m)
+
+    def ids(self) -> List[str]:
+        """List form for export: registry ids in ordinal order, then extras sorted."""
+        known = registry()[1]
+        out, bits, o = [], self.bits, 0
+        while bits:
+            if bits & 1 and o < len(known):
+                out.append(known[o])
+            bits >>= 1
+            o += 1
+        return out + sorted(self.extra)
+
+    def __contains__(self, ch_id: str) -> bool:
+        o = registry()[0].get(ch_id)
+        return ch_id in self.extra if o is None else bool(self.bits >> o & 1)
+
+    def __or__(self, other: "CompletionSet") -> "CompletionSet":
+        return CompletionSet(self.bits | other.bits, self.extra | other.extra)
+
+    def __ior__(self, other: "CompletionSet") -> "CompletionSet":
+        self.bits |= other.bits
+        self.extra |= other.extra
+        return self
+
+    def __sub__(self, other: "CompletionSet") -> "CompletionSet":
+        return CompletionSet(self.bits & ~other.bits, self.extra - other.extra)
+
+    def __len__(self) -> int:
+        return popcount(self.bits) + len(self.extra)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CompletionSet) and self.bits == other.bits and self.extra == other.extra
+
+
+# ---------------------------------------------------------
+# Payload Helpers
+# ---------------------------------------------------------
+def to_payload(completed: CompletionSet) -> Dict[str, Any]:
+    """Wire form: hex bitmap plus the (usually empty) list of unregistered ids."""
+    return {"completed_bits": completed.encode(), "completed": sorted(completed.extra)}
+
+
+def from_payload(data: Dict[str, Any]) -> CompletionSet:
+    """Read completions from a snapshot in the bitmap, legacy list, or delta (gains) form."""
+    s = CompletionSet.decode(data.get("completed_bits"))
+    for ch_id in data.get("completed") or []:
+        s.add(ch_id)
+    for gain in data.get("gains") or []:
+        s.add(gain["id"])
+    return s
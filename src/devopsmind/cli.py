@@ -16,7 +16,11 @@ from .profiles import (
     load_state,
 )
 from .sync import sync_default
+from .store import update_player
 from .constants import VERSION
+from .locking import DRAIN_LOCK, locked
+from .syncqueue import ack, label, unsent
+from .uploader import Upload, send_all
 
 console = Console()
 PROFILE_CREATED = False
@@ -43,13 +47,7 @@ def ensure_profile():
     email = Prompt.ask("📧 Enter your email (for XP sync / recovery)").strip()
 
     profile_create(name)
-    profile_file = Path.home() / ".devopsmind" / "profiles" / f"{name}.yaml"
-
-    if profile_file.exists():
-        data = yaml.safe_load(profile_file.read_text())
-        data["player"]["gamer"] = gamer
-        data["player"]["email"] = email
-        profile_file.write_text(yaml.safe_dump(data))
+    update_player(name, gamer=gamer, email=email)
 
     console.print(Panel.fit(f"✅ Profile '{name}' ({gamer}) created!", border_style="green"))
     PROFILE_CREATED = True
@@ -148,15 +146,21 @@ def auto_submit_via_worker(show_message=True):
     """
     Automatically sync all pending XP submissions to the Cloudflare Worker.
     """
+    with locked(DRAIN_LOCK, blocking=False) as acquired:
+        if not acquired:
+            if show_message:
+                console.print("⏭️ Another devopsmind process is already submitting.")
+            return
+        _auto_submit_via_worker(show_message)
+
+
+def _auto_submit_via_worker(show_message=True):
     state = load_state()
     player = state.get("player", {})
     name = player.get("name", "default")
 
-    pending_dir = Path.home() / ".devopsmind" / ".pending_sync"
-    pending_dir.mkdir(parents=True, exist_ok=True)
-
-    yaml_files = sorted(pending_dir.glob("*.yaml"))
-    if not yaml_files:
+    entries = unsent()
+    if not entries:
         if show_message:
             console.print("✅ No pending submissions to send.")
         return
@@ -166,30 +170,24 @@ def auto_submit_via_worker(show_message=True):
         "https://devopsmind-relay.gauravchile05.workers.dev"
     )
 
-    for file in yaml_files:
-        try:
-            yaml_str = file.read_text()
-            resp = requests.post(
-                WORKER_URL,
-                headers={"Content-Type": "text/plain"},
-                data=yaml_str.encode("utf-8"),
-                timeout=15,
-            )
+    def build(entry):
+        return Upload(WORKER_URL, yaml.safe_dump(entry.snapshot).encode("utf-8"), {"Content-Type": "text/plain"})
 
-            if resp.status_code == 200:
-                data = resp.json()
-                if data.get("ok"):
-                    console.print(
-                        f"✅ Submitted {file.name} → {data.get('branch', 'leaderboard')} "
-                        f"({data.get('sha256','')[:8]})"
-                    )
-                    file.unlink(missing_ok=True)
-                else:
-                    console.print(f"[yellow]⚠️ Worker rejected {file.name}[/yellow]")
-            else:
-                console.print(f"[yellow]⚠️ Worker HTTP {resp.status_code}[/yellow]")
-        except Exception as e:
-            console.print(f"[red]🌐 Submission failed for {file.name}: {e}[/red]")
+    def report(out):
+        if out.ok:
+            console.print(
+                f"✅ Submitted {label(out.item)} → {out.reply.get('branch', 'leaderboard')} "
+                f"({out.reply.get('sha256','')[:8]})"
+            )
+            ack([out.item])
+        elif out.status is None:
+            console.print(f"[red]🌐 Submission failed for {label(out.item)}: {out.error}[/red]")
+        elif out.status == 200:
+            console.print(f"[yellow]⚠️ Worker rejected {label(out.item)}[/yellow]")
+        else:
+            console.print(f"[yellow]⚠️ Worker HTTP {out.status}[/yellow]")
+
+    send_all(entries, build, report)
 
 
 # ---------------------------------------------------------
@@ -0,0 +1,253 @@
+from __future__ import annotations
+import os, sys  # everything else is imported where it is used: forward() runs on every CLI start
+
+# ---------------------------------------------------------
+# Constants
+# ---------------------------------------------------------
+BASE_DIR = os.path.join(os.path.expanduser("~"), ".devopsmind")
+SOCKET_PATH = os.path.join(BASE_DIR, "daemon.sock")
+LOG_FILE = os.path.join(BASE_DIR, "daemon.log")
+FORWARDED = {"list", "play", "validate", "hint", "describe", "stats"}
+CONNECT_TIMEOUT_S = 2
+REPLY_TIMEOUT_S = 180  # longer than the sandbox's default validator limit
+
+
+# ---------------------------------------------------------
+# Client Side
+# ---------------------------------------------------------
+def _command_of(argv: list[str]) -> str | None:
+    if not argv or argv[0] == "--stack":
+        return "list"
+    return argv[0]
+
+
+def _request(msg: dict, timeout: float | None = None) -> dict:
+    import json, socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(min(timeout or CONNECT_TIMEOUT_S, CONNECT_TIMEOUT_S))
+        s.connect(SOCKET_PATH)
+        s.settimeout(timeout)
+        s.sendall(json.dumps(msg).encode() + b"\n")
+        chunks = []
+        while True:
+            data = s.recv(65536)
+            if not data:
+                break
+            chunks.append(data)
+    return json.loads(b"".join(chunks) or b"{}")
+
+
+def forward(argv: list[str]) -> int | None:
+    """
+    Run a warm command through the daemon if one is listening.
+    Returns the exit code, or None if the caller should run the command itself.
+    """
+    if os.getenv("DEVOPSMIND_NO_DAEMON") == "1" or not os.path.exists(SOCKET_PATH):
+        return None
+    if _command_of(argv) not in FORWARDED or "-h" in argv or "--help" in argv or "--all" in argv:
+        return None
+    import socket
+
+    umask = os.umask(0)
+    os.umask(umask)
+    msg = {
+        "argv": argv,
+        # Validators shell out, so they must see the caller's world, not the daemon's
+        "cwd": os.getcwd(),
+        "env": dict(os.environ),
+        "umask": umask,
+        "executable": sys.executable,
+    }
+    try:
+        reply = _request(msg, timeout=REPLY_TIMEOUT_S)
+    except socket.timeout:
+        sys.stderr.write("⚠️ devopsmind daemon did not answer; running without it.\n")
+        return None
+    except (OSError, ValueError):
+        return None
+    if reply.get("fallback"):
+        return None
+    sys.stdout.write(reply.get("out", ""))
+    sys.stderr.write(reply.get("err", ""))
+    sys.stdout.flush()
+    return int(reply.get("code", 0))
+
+
+def control(action: str):
+    """Handle `devopsmind daemon start|stop|status|run`."""
+    import subprocess, time
+    from rich.console import Console
+    console = Console()
+
+    def alive() -> bool:
+        try:
+            return _request({"ping": True}, timeout=2).get("pong", False)
+        except (OSError, ValueError):
+            return False
+
+    if action == "run":
+        serve()
+    elif action == "start":
+        if alive():
+            console.print("[green]✅ Daemon already running.[/green]")
+            return
+        os.makedirs(BASE_DIR, exist_ok=True)
+        with open(LOG_FILE, "a") as log:
+            subprocess.Popen(
+                [sys.executable, "-m", "devopsmind.daemon"],
+                stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+                start_new_session=True, close_fds=True,
+            )
+        for _ in range(50):
+            if alive():
+                console.print(f"[green]✅ Daemon started ({SOCKET_PATH}).[/green]")
+                return
+            time.sleep(0.1)
+        console.print(f"[yellow]⚠️ Daemon did not come up; see {LOG_FILE}.[/yellow]")
+    elif action == "stop":
+        try:
+            _request({"shutdown": True}, timeout=5)
+            console.print("[green]✅ Daemon stopped.[/green]")
+        except (OSError, ValueError):
+            console.print("[dim]Daemon is not running.[/dim]")
+            _unlink_socket()
+    elif action == "status":
+        if alive():
+            console.print(f"[green]🟢 Daemon running ({SOCKET_PATH}).[/green]")
+        else:
+            console.print("[dim]⚪ Daemon not running.[/dim]")
+
+
+def _unlink_socket():
+    try:
+        os.unlink(SOCKET_PATH)
+    except FileNotFoundError:
+        pass
+
+
+# ---------------------------------------------------------
+# Server Side
+# ---------------------------------------------------------
+class _Reloader:
+    """Watch challenge dirs; drop in-memory caches when they change."""
+
+    def __init__(self):
+        from .engine import BASES
+        from .watch import make_watcher
+        self.watchers = [make_watcher(b) for b in BASES if b.exists()]
+
+    def check(self):
+        changed = False
+        for w in self.watchers:
+            if w.wait(0):
+                w.drain()
+                changed = True
+        if changed:
+            from . import engine, index
+            engine._CATALOG.clear()
+            index.reset()
+
+
+class _client_context:
+    """`with _client_context(msg):` runs with the client's cwd, environment and umask."""
+
+    def __init__(self, msg: dict):
+        self.msg = msg
+
+    def __enter__(self):
+        self.env, self.cwd = dict(os.environ), os.getcwd()
+        self.umask = os.umask(int(self.msg.get("umask", 0o022)))
+        if "env" in self.msg:
+            os.environ.clear()
+            os.environ.update(self.msg["env"])
+        if self.msg.get("cwd"):
+            os.chdir(self.msg["cwd"])
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        os.chdir(self.cwd)
+        os.environ.clear()
+        os.environ.update(self.env)
+        os.umask(self.umask)
+        return False
+
+
+def _handle(msg: dict, reloader: _Reloader) -> dict:
+    import contextlib, io
+    from .__main__ import build_parser, dispatch
+    from .profiles import flush, load_state
+
+    reloader.check()
+    player = load_state().get("player", {})
+    if not (player.get("email") and player.get("gamer")):
+        return {"fallback": True}  # first-run setup is interactive; let the client do it
+
+    if msg.get("executable", sys.executable) != sys.executable:
+        return {"fallback": True}  # different interpreter / venv: validators would differ
+
+    argv = msg.get("argv", [])
+    out, err = io.StringIO(), io.StringIO()
+    code = 0
+    with _client_context(msg), contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        try:
+            parser = build_parser()
+            dispatch(parser, parser.parse_args(argv), argv)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception as e:
+            print(f"❌ Daemon error: {e}")
+            code = 1
+        finally:
+            flush()  # no atexit in a long-lived process; persist this command's state now
+    return {"out": out.getvalue(), "err": err.getvalue(), "code": code}
+
+
+def serve():
+    """Serve forwarded commands over ~/.devopsmind/daemon.sock, one at a time."""
+    import json, socket
+    from .engine import discover
+    from .net import session
+
+    os.makedirs(BASE_DIR, exist_ok=True)
+    _unlink_socket()
+    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    srv.bind(SOCKET_PATH)
+    os.chmod(SOCKET_PATH, 0o600)
+    srv.listen(16)
+
+    # Warm everything a command would otherwise pay for on startup
+    discover()
+    session()
+    reloader = _Reloader()
+    print(f"devopsmind daemon listening on {SOCKET_PATH} (pid {os.getpid()})", flush=True)
+
+    try:
+        while True:
+            conn, _ = srv.accept()
+            with conn:
+                try:
+                    buf = b""
+                    while not buf.endswith(b"\n"):
+                        data = conn.recv(65536)
+                        if not data:
+                            break
+                        buf += data
+                    msg = json.loads(buf or b"{}")
+                    if msg.get("ping"):
+                        reply = {"pong": True}
+                    elif msg.get("shutdown"):
+                        conn.sendall(json.dumps({"ok": True}).encode())
+                        break
+                    else:
+                        reply = _handle(msg, reloader)
+                    conn.sendall(json.dumps(reply).encode())
+                except Exception as e:
+                    print(f"⚠️ Request failed: {e}", flush=True)
+    finally:
+        srv.close()
+        _unlink_socket()
+
+
+if __name__ == "__main__":
+    serve()
@@ -1,10 +1,16 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
 from pathlib import Path
-import importlib.util, yaml, inspect, os, json, shutil
+import os, json, shutil
 from datetime import datetime, timezone
 from typing import Dict, Any, List
 from .profiles import load_state
+from .index import load_records, lookup_record, challenge_manifest, file_hashes
+from .materialize import materialize
+from .validators import load_validator, call_validate
+from .sandbox import run_sandboxed
+from . import resultcache
 from .progress import record_completion, _queue_for_sync  # ✅ sync support
 
 
@@ -15,6 +21,12 @@ REPO_ROOT = Path(__file__).resolve().parents[2]
 BUNDLED = REPO_ROOT / "challenges"
 HOME = Path.home() / ".devopsmind" / "challenges"
 CONFIG_HOME = Path.home() / ".config" / "devopsmind" / "challenges"
+WORKSPACE_ROOT = Path.home() / "DevOpsMind" / "workspace"
+WORKSPACE_MANIFEST = ".devopsmind-manifest.json"
+BASES = [BUNDLED, HOME, CONFIG_HOME]
+
+# id / "stack/tier" -> Challenge, reused for the lifetime of the process
+_CATALOG: Dict[str, "Challenge"] = {}
 
 
 # ---------------------------------------------------------
@@ -48,66 +60,44 @@ class Challenge:
     tags: list[str]
     path: Path
     hint: str
+    readonly: list[str] = field(default_factory=list)  # globs hardlinked into workspaces from the content store
+    timeout_s: int | None = None                        # sandboxed validator wall-clock limit
+    cache: bool = True                                  # allow reusing results for an unchanged workspace
+    fingerprint: list[str] = field(default_factory=list)  # globs of inputs the validator reads (default: all)
 
 
 # ---------------------------------------------------------
 # Challenge Discovery
 # ---------------------------------------------------------
-def _iter_challenge_dirs(base: Path):
-    if not base.exists():
-        return
-    for stack in sorted(base.iterdir()):
-        if not stack.is_dir():
-            continue
-        for tier in ["easy", "medium", "hard"]:
-            d = stack / tier
-            if (d / "challenge.yaml").exists() or (d / "metadata.json").exists():
-                yield d
+def _to_challenge(rec: Dict[str, Any]) -> Challenge:
+    return Challenge(**{**rec, "path": Path(rec["path"])})
 
 
 def discover() -> List[Challenge]:
-    found = []
-    xp_defaults = {"easy": 50, "medium": 100, "hard": 150}
-
-    for base in [BUNDLED, HOME, CONFIG_HOME]:
-        if not base.exists():
-            continue
-
-        for d in _iter_challenge_dirs(base):
-            meta_file = d / "challenge.yaml"
-            if not meta_file.exists():
-                meta_file = d / "metadata.json"
-            if not meta_file.exists():
-                continue
-
-            try:
-                if meta_file.suffix == ".yaml":
-                    meta = yaml.safe_load(meta_file.read_text())
-                else:
-                    meta = json.loads(meta_file.read_text())
-            except Exception as e:
-                print(f"⚠️ Failed to parse metadata in {meta_file}: {e}")
-                continue
-
-            diff = meta.get("difficulty", meta.get("diff", "easy")).lower()
-            xp_value = meta.get("xp", xp_defaults.get(diff, 50))
-
-            found.append(
-                Challenge(
-                    id=str(meta.get("id", d.name)),
-                    title=meta.get("title", meta.get("id", d.name)),
-                    difficulty=diff,
-                    xp=int(xp_value),
-                    tags=meta.get("tags", []),
-                    path=d,
-                    hint=meta.get("hint", "No hint provided."),
-                )
-            )
+    found = [_to_challenge(rec) for rec in load_records(BASES)]
 
     uniq = {c.id: c for c in found}
+    _CATALOG.update(uniq)
     return sorted(uniq.values(), key=lambda c: c.id.lower())
 
 
+def get_challenge(ch_id: str) -> Challenge | None:
+    """
+    Look up a single challenge by id, or by stack/tier address (e.g. "docker/hard").
+    Uses the persisted id -> location map instead of building the whole catalog.
+    """
+    ref = str(ch_id).strip()
+    if ref in _CATALOG:
+        return _CATALOG[ref]
+
+    rec = lookup_record(BASES, ref)
+    if not rec:
+        return None
+    ch = _to_challenge(rec)
+    _CATALOG[ref] = ch
+    return ch
+
+
 # ---------------------------------------------------------
 # Validator Loader
 # ---------------------------------------------------------
@@ -115,12 +105,51 @@ def _load_validator(ch_dir: Path):
     v = ch_dir / "validator.py"
     if not v.exists():
         return None
-    spec = importlib.util.spec_from_file_location("validator", v)
-    mod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
+    mod = load_validator(v)
     return mod if hasattr(mod, "validate") else None
 
 
+# ---------------------------------------------------------
+# Validator Runner
+# ---------------------------------------------------------
+def run_validator(mod, workspace_dir: Path, context: Dict[str, Any] | None = None) -> tuple[bool, str]:
+    """Run mod.validate() with workspace_dir as the (process-wide) working directory."""
+    old_cwd = Path.cwd()
+    try:
+        os.chdir(workspace_dir)
+        ok, msg = call_validate(mod, context)
+    except Exception as e:
+        ok, msg = False, f"Validator threw an exception: {e}"
+    finally:
+        os.chdir(old_cwd)
+    return ok, msg
+
+
+def validate_in(ch: Challenge, mod, workspace_dir: Path, context: Dict[str, Any] | None = None,
+                sandbox: bool = False, use_cache: bool = True) -> tuple[bool, str]:
+    """
+    Validate ch in workspace_dir, either in-process (mod) or in a sandboxed child process.
+    Verdicts are cached by (validator hash, workspace fingerprint, context).
+    """
+    validator = ch.path / "validator.py"
+    key = data = None
+    if use_cache and ch.cache:
+        key, data = resultcache.cache_key(validator, workspace_dir, context, ch.fingerprint)
+        hit = resultcache.lookup(key, data)
+        if hit:
+            print("⚡ Workspace unchanged — reusing cached result (use --no-cache to re-run).")
+            return hit
+
+    if sandbox:
+        ok, msg = run_sandboxed(validator, workspace_dir, context, ch.timeout_s)
+    else:
+        ok, msg = run_validator(mod, workspace_dir, context)
+
+    if key and resultcache.is_verdict(ok, msg):
+        resultcache.store(key, data, ok, msg)
+    return ok, msg
+
+
 # ---------------------------------------------------------
 # Session Log
 # ---------------------------------------------------------
@@ -144,105 +173,123 @@ def _log_session(ch_id: str, msg: str, success: bool, xp: int):
 # ---------------------------------------------------------
 # Recursive Challenge Copier (preserves user files)
 # ---------------------------------------------------------
+def copy_challenge_files(src: Path, dest: Path, manifest: Dict[str, Any]) -> int:
+    """Copy the files listed in a challenge manifest from src into dest."""
+    for rel in manifest["dirs_mtime"]:
+        (dest / rel).mkdir(parents=True, exist_ok=True)
+
+    copied = 0
+    for rel in manifest["files"]:
+        src_file = src / rel
+        try:
+            materialize(src_file, dest / rel)
+            copied += 1
+        except Exception as e:
+            print(f"⚠️ Failed to copy {src_file}: {e}")
+    return copied
+
+
 def copy_challenge_recursive(src: Path, dest: Path) -> int:
     """
     Recursively copy all valid files/folders (scripts/, logs/, templates/, etc.)
     while skipping __pycache__, hidden system dirs, and preserving user content.
     """
-    copied = 0
-    for root, dirs, files in os.walk(src):
-        dirs[:] = [d for d in dirs if d not in {"__pycache__", ".git", ".pytest_cache"} and not d.startswith(".")]
-        rel_path = Path(root).relative_to(src)
-        target_dir = dest / rel_path
-        target_dir.mkdir(parents=True, exist_ok=True)
-
-        for f in files:
-            if f.endswith((".pyc", ".pyo", ".DS_Store", ".gitkeep")) or f.startswith("."):
-                continue
-            src_file = Path(root) / f
-            dest_file = target_dir / f
-            try:
-                shutil.copy2(src_file, dest_file)
-                copied += 1
-            except Exception as e:
-                print(f"⚠️ Failed to copy {src_file}: {e}")
-    return copied
+    return copy_challenge_files(src, dest, challenge_manifest(src))
+
+
+# ---------------------------------------------------------
+# Incremental Workspace Refresh (content-hash manifest)
+# ---------------------------------------------------------
+def refresh_workspace(src: Path, dest: Path, readonly: List[str] | None = None) -> tuple[int, int]:
+    """
+    Bring challenge files in dest up to date with src.
+    A file is rewritten only if its upstream hash changed or the workspace
+    copy no longer matches what was last written. Files matching a
+    `readonly` glob are hardlinked from the read-only content store instead of copied.
+    Returns (copied, skipped).
+    """
+    manifest = challenge_manifest(src)
+    upstream = file_hashes(src, manifest)
+    state_file = dest / WORKSPACE_MANIFEST
+
+    try:
+        previous = json.loads(state_file.read_text())
+        previous = previous.get("files", {}) if previous.get("source") == str(src) else {}
+    except Exception:
+        previous = {}
+
+    for rel in manifest["dirs_mtime"]:
+        (dest / rel).mkdir(parents=True, exist_ok=True)
+
+    current = {}
+    copied = skipped = 0
+    for rel, digest in upstream.items():
+        target = dest / rel
+        try:
+            st = target.stat()
+        except OSError:
+            st = None
+
+        prev = previous.get(rel)
+        link = any(fnmatch(rel, pat) for pat in readonly or [])
+        # A writable hardlink (from older releases) would write through to the source
+        shared_writable = link and st is not None and st.st_nlink > 1 and st.st_mode & 0o222
+        if (prev and st and not shared_writable and prev["sha256"] == digest
+                and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns):
+            current[rel] = prev
+            skipped += 1
+            continue
+
+        try:
+            if target.is_dir():
+                shutil.rmtree(target)
+            materialize(src / rel, target, digest=digest if link else None)
+            st = target.stat()
+            current[rel] = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            copied += 1
+        except Exception as e:
+            print(f"⚠️ Failed to copy {src / rel}: {e}")
+
+    try:
+        tmp = state_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"source": str(src), "files": current}))
+        os.replace(tmp, state_file)
+    except Exception as e:
+        print(f"⚠️ Failed to write workspace manifest: {e}")
+
+    return copied, skipped
 
 
 # ---------------------------------------------------------
 # Play Logic (refresh only challenge files)
 # ---------------------------------------------------------
-def play(ch_id: str, context: Dict[str, Any] | None = None, return_data: bool = False):
+def play(ch_id: str, context: Dict[str, Any] | None = None, return_data: bool = False,
+         sandbox: bool = False, use_cache: bool = True):
     ch_id = str(ch_id).strip()
-    ch = next((c for c in discover() if c.id == ch_id), None)
+    ch = get_challenge(ch_id)
     if not ch:
         _log_session(ch_id, "Challenge not found.", False, 0)
         return (False, None) if return_data else False
 
-    mod = _load_validator(ch.path)
-    if not mod:
+    mod = None if sandbox else _load_validator(ch.path)
+    if not (ch.path / "validator.py").exists() or not (sandbox or mod):
         _log_session(ch_id, "Validator missing.", False, 0)
         return (False, None) if return_data else False
 
-    workspace_root = Path.home() / "DevOpsMind" / "workspace"
-    workspace_dir = workspace_root / ch.id
+    workspace_dir = WORKSPACE_ROOT / ch.id
     workspace_dir.mkdir(parents=True, exist_ok=True)
     print(f"📂 Workspace: {workspace_dir}")
 
-    base = Path.home() / ".devopsmind" / "challenges"
-    challenge_src = None
-
-    # 🔍 Locate challenge source
-    for path in base.rglob("*"):
-        if path.is_dir() and path.name.strip().lower() == ch.id.strip().lower():
-            challenge_src = path
-            break
-
-    if not challenge_src:
-        for path in base.rglob("*"):
-            if path.is_dir() and path.name.lower() == ch.difficulty.lower() and ch_id.startswith(path.parent.name.split("-")[-1]):
-                challenge_src = path
-                break
-
-    if not challenge_src and ch.path.exists():
-        challenge_src = ch.path
+    challenge_src = ch.path if ch.path.exists() else None
 
     # 🧹 Smart refresh — preserve user-created files
-    if challenge_src and challenge_src.exists():
-        challenge_files = {
-            str(f.relative_to(challenge_src))
-            for f in challenge_src.rglob("*")
-            if f.is_file()
-        }
-
-        for existing in workspace_dir.rglob("*"):
-            rel = existing.relative_to(workspace_dir)
-            if existing.name.startswith("."):
-                continue
-            if str(rel) in challenge_files:
-                try:
-                    if existing.is_dir():
-                        shutil.rmtree(existing)
-                    else:
-                        existing.unlink()
-                except Exception as e:
-                    print(f"⚠️ Failed to remove old file {existing}: {e}")
-
-        copied = copy_challenge_recursive(challenge_src, workspace_dir)
-        print(f"✅ Copied {copied} file(s) from {challenge_src}.")
+    if challenge_src:
+        copied, skipped = refresh_workspace(challenge_src, workspace_dir, ch.readonly)
+        print(f"✅ Copied {copied} file(s) from {challenge_src} ({skipped} unchanged, skipped).")
     else:
         print(f"⚠️ Could not locate challenge '{ch.id}' in ~/.devopsmind/challenges/.")
 
-    # Run validator
-    old_cwd = Path.cwd()
-    try:
-        os.chdir(workspace_dir)
-        sig = inspect.signature(mod.validate)
-        ok, msg = (mod.validate() if len(sig.parameters) == 0 else mod.validate(context or {}))
-    except Exception as e:
-        ok, msg = False, f"Validator threw an exception: {e}"
-    finally:
-        os.chdir(old_cwd)
+    ok, msg = validate_in(ch, mod, workspace_dir, context, sandbox, use_cache)
 
     _log_session(ch.id, msg, ok, ch.xp if ok else 0)
 
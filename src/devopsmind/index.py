@@ -0,0 +1,318 @@
+from __future__ import annotations
+from pathlib import Path
+import hashlib, json, os
+from typing import Dict, Any, List
+
+# ---------------------------------------------------------
+# Constants
+# ---------------------------------------------------------
+CACHE_DIR = Path.home() / ".devopsmind" / "cache"
+INDEX_FILE = CACHE_DIR / "challenge_index.json"
+INDEX_VERSION = 6
+
+TIERS = ["easy", "medium", "hard"]
+XP_DEFAULTS = {"easy": 50, "medium": 100, "hard": 150}
+SKIP_DIRS = {"__pycache__", ".git", ".pytest_cache"}
+SKIP_SUFFIXES = (".pyc", ".pyo", ".DS_Store", ".gitkeep")
+
+_index: Dict[str, Any] | None = None
+_dirty = False
+
+
+# ---------------------------------------------------------
+# Index Storage
+# ---------------------------------------------------------
+def _empty_index() -> Dict[str, Any]:
+    return {"version": INDEX_VERSION, "bases": {}, "entries": {}, "ids": {}, "manifests": {}}
+
+
+def _load_index() -> Dict[str, Any]:
+    global _index
+    if _index is not None:
+        return _index
+    try:
+        data = json.loads(INDEX_FILE.read_text())
+        if data.get("version") != INDEX_VERSION:
+            data = _empty_index()
+    except Exception:
+        data = _empty_index()
+    _index = data
+    return _index
+
+
+def _save_index():
+    """Atomically persist the index if anything changed (best effort)."""
+    global _dirty
+    if not _dirty or _index is None:
+        return
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = INDEX_FILE.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(_index))
+        os.replace(tmp, INDEX_FILE)
+        _dirty = False
+    except Exception:
+        pass
+
+
+def reset():
+    """Drop the in-process copy of the index (next access re-reads it)."""
+    global _index, _dirty
+    _index = None
+    _dirty = False
+
+
+def _mtime_ns(p: Path) -> int | None:
+    try:
+        return p.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+# ---------------------------------------------------------
+# Directory Listing (keyed by directory mtimes)
+# ---------------------------------------------------------
+def _scan_base(base: Path) -> Dict[str, Any]:
+    """List challenge dirs under base, recording the mtimes that key the listing."""
+    dirs_mtime = {str(base): _mtime_ns(base)}
+    dirs = []
+    for stack in sorted(base.iterdir()):
+        if not stack.is_dir():
+            continue
+        dirs_mtime[str(stack)] = _mtime_ns(stack)
+        for tier in TIERS:
+            d = stack / tier
+            m = _mtime_ns(d)
+            if m is None:
+                continue
+            dirs_mtime[str(d)] = m
+            if (d / "challenge.yaml").exists():
+                dirs.append([str(d), str(d / "challenge.yaml")])
+            elif (d / "metadata.json").exists():
+                dirs.append([str(d), str(d / "metadata.json")])
+    return {"dirs_mtime": dirs_mtime, "dirs": dirs}
+
+
+def _listing_valid(listing: Dict[str, Any]) -> bool:
+    return all(_mtime_ns(Path(p)) == m for p, m in listing["dirs_mtime"].items())
+
+
+def _base_listing(base: Path) -> Dict[str, Any]:
+    global _dirty
+    idx = _load_index()
+    listing = idx["bases"].get(str(base))
+    if listing is None or not _listing_valid(listing):
+        listing = _scan_base(base)
+        idx["bases"][str(base)] = listing
+        _dirty = True
+    return listing
+
+
+# ---------------------------------------------------------
+# Entry Parsing (keyed by file stat + content hash)
+# ---------------------------------------------------------
+def _build_record(d: Path, meta: Dict[str, Any]) -> Dict[str, Any]:
+    diff = meta.get("difficulty", meta.get("diff", "easy")).lower()
+    xp_value = meta.get("xp", XP_DEFAULTS.get(diff, 50))
+    return {
+        "id": str(meta.get("id", d.name)),
+        "title": meta.get("title", meta.get("id", d.name)),
+        "difficulty": diff,
+        "xp": int(xp_value),
+        "tags": meta.get("tags", []),
+        "path": str(d),
+        "hint": meta.get("hint", "No hint provided."),
+        "readonly": [str(p) for p in meta.get("readonly", [])],
+        "timeout_s": meta.get("timeout_s"),
+        "cache": bool(meta.get("cache", True)),
+        "fingerprint": [str(p) for p in meta.get("fingerprint", [])],
+    }
+
+
+def _entry_record(d: str, meta_path: str) -> Dict[str, Any] | None:
+    """Return the cached record for a challenge dir, re-parsing only if its metadata changed."""
+    global _dirty
+    idx = _load_index()
+    meta_file = Path(meta_path)
+    try:
+        st = meta_file.stat()
+    except OSError:
+        return None
+
+    entry = idx["entries"].get(d)
+    if entry and entry["meta"] == meta_path:
+        if entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            return entry["record"]
+
+    raw = meta_file.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    if entry and entry["meta"] == meta_path and entry["sha256"] == digest:
+        entry["mtime_ns"], entry["size"] = st.st_mtime_ns, st.st_size
+        _dirty = True
+        return entry["record"]
+
+    try:
+        if meta_file.suffix == ".yaml":
+            import yaml  # only needed when a challenge actually has to be re-parsed
+            meta = yaml.safe_load(raw.decode())
+        else:
+            meta = json.loads(raw.decode())
+    except Exception as e:
+        print(f"⚠️ Failed to parse metadata in {meta_file}: {e}")
+        return None
+
+    record = _build_record(Path(d), meta or {})
+    idx["entries"][d] = {
+        "meta": meta_path,
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": digest,
+        "record": record,
+    }
+    _dirty = True
+    return record
+
+
+# ---------------------------------------------------------
+# Public API
+# ---------------------------------------------------------
+def load_records(bases: List[Path]) -> List[Dict[str, Any]]:
+    """
+    Return challenge records for every base, in discovery order.
+    Unchanged challenges come straight from ~/.devopsmind/cache/challenge_index.json.
+    """
+    global _dirty
+    records = []
+    seen = set()
+    for base in bases:
+        if not base.exists():
+            continue
+        for d, meta_path in _base_listing(base)["dirs"]:
+            seen.add(d)
+            rec = _entry_record(d, meta_path)
+            if rec:
+                records.append(rec)
+
+    # Forget entries whose directories disappeared
+    idx = _load_index()
+    stale = [d for d in idx["entries"] if d not in seen]
+    for d in stale:
+        del idx["entries"][d]
+
+    # id -> location map (later bases override earlier ones, like discover())
+    ids = {rec["id"]: rec["path"] for rec in records}
+    if stale or ids != idx["ids"]:
+        idx["ids"] = ids
+        _dirty = True
+
+    _save_index()
+    return records
+
+
+def match_stack(name: str, stack: str) -> bool:
+    """True if a stack dir name ("06-docker") matches a user filter ("docker" or "06-docker")."""
+    name, stack = name.lower(), stack.lower()
+    return name == stack or name.split("-", 1)[-1] == stack
+
+
+def _resolve_stack_tier(bases: List[Path], ref: str) -> Dict[str, Any] | None:
+    """Resolve 'docker/hard' by looking into the matching tier directory only."""
+    stack, _, tier = ref.strip("/").partition("/")
+    tier = tier.lower()
+    if tier not in TIERS:
+        return None
+
+    for base in reversed(bases):
+        if not base.exists():
+            continue
+        for stack_dir in sorted(base.iterdir()):
+            if not stack_dir.is_dir() or not match_stack(stack_dir.name, stack):
+                continue
+            d = stack_dir / tier
+            for meta_name in ["challenge.yaml", "metadata.json"]:
+                if (d / meta_name).exists():
+                    rec = _entry_record(str(d), str(d / meta_name))
+                    _save_index()
+                    return rec
+    return None
+
+
+def lookup_record(bases: List[Path], ref: str) -> Dict[str, Any] | None:
+    """
+    Return the record for a challenge id (or 'stack/tier' address).
+    Known ids are resolved through the persisted id -> location map and only
+    their own metadata is checked; unknown ids fall back to a catalog refresh.
+    """
+    if "/" in ref:
+        return _resolve_stack_tier(bases, ref)
+
+    idx = _load_index()
+    d = idx["ids"].get(ref)
+    entry = idx["entries"].get(d) if d else None
+    if entry:
+        rec = _entry_record(d, entry["meta"])
+        if rec and rec["id"] == ref:
+            _save_index()
+            return rec
+
+    for rec in reversed(load_records(bases)):
+        if rec["id"] == ref:
+            return rec
+    return None
+
+
+# ---------------------------------------------------------
+# Per-Challenge File Manifest
+# ---------------------------------------------------------
+def _scan_files(src: Path) -> Dict[str, Any]:
+    """Walk a challenge dir once, skipping __pycache__, hidden dirs and system files."""
+    dirs_mtime = {}
+    files = []
+    for root, dirs, names in os.walk(src):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith("."))
+        rel_root = Path(root).relative_to(src)
+        dirs_mtime[str(rel_root)] = _mtime_ns(Path(root))
+        for f in sorted(names):
+            if f.endswith(SKIP_SUFFIXES) or f.startswith("."):
+                continue
+            files.append(str(rel_root / f))
+    return {"dirs_mtime": dirs_mtime, "files": files, "hashes": {}}
+
+
+def challenge_manifest(src: Path) -> Dict[str, Any]:
+    """
+    Return {"dirs_mtime": {rel: mtime}, "files": [rel, ...], "hashes": {...}} for a challenge dir.
+    The manifest is reused while none of its directories changed.
+    """
+    global _dirty
+    manifests = _load_index()["manifests"]
+    m = manifests.get(str(src))
+    if m is None or not all(_mtime_ns(src / rel) == mt for rel, mt in m["dirs_mtime"].items()):
+        m = _scan_files(src)
+        manifests[str(src)] = m
+        _dirty = True
+        _save_index()
+    return m
+
+
+def file_hashes(src: Path, manifest: Dict[str, Any]) -> Dict[str, str]:
+    """Return {rel: sha256} for manifest files, re-hashing only files whose stat changed."""
+    global _dirty
+    cached = manifest.setdefault("hashes", {})
+    out = {}
+    for rel in manifest["files"]:
+        f = src / rel
+        try:
+            st = f.stat()
+        except OSError:
+            continue
+        hit = cached.get(rel)
+        if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+            out[rel] = hit[2]
+            continue
+        digest = hashlib.sha256(f.read_bytes()).hexdigest()
+        cached[rel] = [st.st_size, st.st_mtime_ns, digest]
+        out[rel] = digest
+        _dirty = True
+    _save_index()
+    return out
@@ -4,7 +4,8 @@ from rich.table import Table
 from rich.panel import Panel
 import yaml, requests, json
 
-from .profiles import PROFILES, load_state
+from .profiles import load_state
+from .store import leaderboard_rows
 
 console = Console()
 
@@ -54,19 +55,9 @@ def fetch_global_leaderboard() -> dict:
 
 def fetch_local_leaderboard() -> list:
     rows = []
-    for pf in PROFILES.glob("*.yaml"):
-        try:
-            data = yaml.safe_load(pf.read_text())
-            player = data.get("player", {})
-            name = player.get("name", pf.stem)
-            gamer = player.get("gamer", "")
-            xp = player.get("xp", 0)
-            rank = player.get("rank", "Beginner")
-            display = f"{name} ({gamer})" if gamer else name
-            rows.append((display, xp, rank))
-        except Exception:
-            pass
-    rows.sort(key=lambda r: r[1], reverse=True)
+    for name, gamer, xp, rank in leaderboard_rows():
+        display = f"{name} ({gamer})" if gamer else name
+        rows.append((display, xp, rank))
     return rows
 
 
@@ -0,0 +1,61 @@
+from __future__ import annotations
+from pathlib import Path
+from contextlib import contextmanager
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked behaviour
+    fcntl = None
+
+# ---------------------------------------------------------
+# Constants
+# ---------------------------------------------------------
+BASE_DIR = Path.home() / ".devopsmind"
+QUEUE_LOCK = BASE_DIR / ".pending_sync.lock"   # held briefly while adding to the queue
+DRAIN_LOCK = BASE_DIR / ".pending_drain.lock"  # held by whoever is uploading / merging the queue
+
+
+# ---------------------------------------------------------
+# Advisory Locks
+# ---------------------------------------------------------
+@contextmanager
+def locked(path: Path, blocking: bool = True):
+    """
+    Hold an exclusive fcntl lock on `path` for the duration of the block.
+    Yields True once acquired, or False if blocking=False and someone else holds it.
+    The lock is released automatically if the process dies.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as fh:
+        if fcntl is None:
+            yield True
+            return
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+# ---------------------------------------------------------
+# Atomic Queue Writes
+# ---------------------------------------------------------
+def write_new(path: Path, text: str) -> Path:
+    """
+    Atomically create `path` (temp file + rename) without clobbering an existing
+    file of the same name; a numeric suffix is added instead. Call under QUEUE_LOCK.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    final, n = path, 1
+    while final.exists():
+        final = path.with_name(f"{path.stem}-{n}{path.suffix}")
+        n += 1
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, final)
+    return final
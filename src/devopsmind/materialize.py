@@ -0,0 +1,131 @@
+from __future__ import annotations
+from pathlib import Path
+import hashlib, os, shutil, sys
+
+# ---------------------------------------------------------
+# Constants
+# ---------------------------------------------------------
+FICLONE = 0x40049409  # _IOW(0x94, 9, int) — btrfs / XFS / bcachefs reflinks
+_CHUNK = 1 << 30
+STORE_DIR = Path.home() / ".devopsmind" / "cache" / "objects"  # read-only, content-addressed
+
+
+# ---------------------------------------------------------
+# Kernel-side Copy Strategies
+# ---------------------------------------------------------
+def _reflink(sfd: int, dfd: int, size: int) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        import fcntl
+        fcntl.ioctl(dfd, FICLONE, sfd)
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+def _copy_file_range(sfd: int, dfd: int, size: int) -> bool:
+    if not hasattr(os, "copy_file_range"):
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            n = os.copy_file_range(sfd, dfd, min(size - copied, _CHUNK))
+            if n == 0:
+                break
+            copied += n
+    except OSError:
+        return False
+    return copied == size
+
+
+def _sendfile(sfd: int, dfd: int, size: int) -> bool:
+    if not hasattr(os, "sendfile"):
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            n = os.sendfile(dfd, sfd, copied, min(size - copied, _CHUNK))
+            if n == 0:
+                break
+            copied += n
+    except OSError:
+        return False
+    return copied == size
+
+
+_STRATEGIES = [("reflink", _reflink), ("copy_file_range", _copy_file_range), ("sendfile", _sendfile)]
+
+
+# ---------------------------------------------------------
+# Read-only Content Store (hardlink targets)
+# ---------------------------------------------------------
+def _stored(src: Path, digest: str) -> Path | None:
+    """
+    Path of a read-only copy of src under STORE_DIR, keyed by its sha256, made
+    on first use. Workspaces hardlink to it, never to src, so the challenge
+    tree keeps its permissions and `devopsmind sync` can still update it.
+    None when read-only can't protect it (root ignores mode bits) or the copy
+    doesn't match digest; the caller then copies instead.
+    """
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        return None
+    obj = STORE_DIR / digest[:2] / digest
+    if obj.exists():
+        return obj
+    tmp = obj.with_name(f".{digest}.{os.getpid()}.tmp")
+    try:
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        _copy(src, tmp)
+        if hashlib.sha256(tmp.read_bytes()).hexdigest() != digest:
+            tmp.unlink()
+            return None
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, obj)
+        return obj
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        return None
+
+
+# ---------------------------------------------------------
+# Materialize One File
+# ---------------------------------------------------------
+def _copy(src: Path, dest: Path) -> str:
+    size = src.stat().st_size
+    method = "copy"
+    with open(src, "rb") as s, open(dest, "wb") as d:
+        for name, strategy in _STRATEGIES:
+            if strategy(s.fileno(), d.fileno(), size):
+                method = name
+                break
+            # Undo any partial write before trying the next strategy
+            s.seek(0)
+            d.seek(0)
+            d.truncate()
+        else:
+            shutil.copyfileobj(s, d)
+
+    shutil.copystat(src, dest)
+    return method
+
+
+def materialize(src: Path, dest: Path, digest: str | None = None) -> str:
+    """
+    Place src at dest using the cheapest available method and return its name.
+    Read-only inputs (given their sha256 digest) are hardlinked from the content
+    store; everything else is reflinked, then copied in-kernel
+    (copy_file_range / sendfile), then copied in userspace.
+    dest is always unlinked first so a previous hardlink never gets written through.
+    """
+    if dest.exists() or dest.is_symlink():
+        dest.unlink()
+
+    obj = _stored(src, digest) if digest else None
+    if obj is not None:
+        try:
+            os.link(obj, dest)
+            return "hardlink"
+        except OSError:
+            pass
+    return _copy(src, dest)
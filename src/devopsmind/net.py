@@ -0,0 +1,20 @@
+# ---------------------------------------------------------
+# Shared HTTP Session (keep-alive connection pool)
+# ---------------------------------------------------------
+_session = None
+POOL_SIZE = 16
+
+
+def session():
+    """Return the process-wide requests.Session, creating it on first use."""
+    global _session
+    if _session is None:
+        import requests  # deferred: only network commands pay for it
+        from requests.adapters import HTTPAdapter
+        _session = requests.Session()
+        _session.headers["User-Agent"] = "devopsmind-cli"
+        # Enough pooled connections per host for the concurrent uploader
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+    return _session
@@ -1,8 +1,12 @@
 from pathlib import Path
-import yaml, requests, json, os, hashlib
+import json, os, hashlib, copy, atexit
 from datetime import datetime
 from rich.console import Console
 from rich.panel import Panel
+from .net import session
+from . import store
+from .bitmap import CompletionSet, to_payload
+from .syncqueue import enqueue, label
 
 console = Console()
 
@@ -11,41 +15,60 @@ console = Console()
 # ---------------------------------------------------------
 BASE_DIR = Path.home() / ".devopsmind"
 PROFILES = BASE_DIR / "profiles"
-PROFILES.mkdir(parents=True, exist_ok=True)
 
 ACTIVE_PROFILE = PROFILES / "active.txt"
-PROFILES_FILE = PROFILES / "default.yaml"
 
-# All wins are queued locally until submit
-PENDING_SYNC_DIR = BASE_DIR / ".pending_sync"
-PENDING_SYNC_DIR.mkdir(parents=True, exist_ok=True)
+# All wins are queued locally (sync_queue.log) until submit
+PENDING_SYNC_DIR = BASE_DIR / ".pending_sync"  # legacy queue, imported on first drain
 
-# Track last saved state to prevent redundant syncs
-_last_saved_state = {}
+DEFAULT_STATE = {
+    "player": {"name": "default", "gamer": "", "email": "", "xp": 0, "rank": "Beginner"},
+    "progress": {"completed": []},
+}
+
+# Loaded profiles keyed by name, valid while the store's data_version is unchanged
+_state_cache = {}
+
+# Write-behind: states staged by save_state(), flushed once at exit (or by flush())
+_pending = {}
+_base = {}              # name -> state as last read from the store; flush() writes the delta
+_persisted_digest = {}  # name -> digest of the state last read from / written to the store
+_flush_registered = False
+
+
+def _digest(state: dict) -> str:
+    """Structural hash of a profile state; nested edits change it, dict order does not."""
+    return hashlib.sha256(json.dumps(state, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def invalidate_cache():
+    """Forget all loaded profiles."""
+    _state_cache.clear()
 
 
 # ---------------------------------------------------------
-# Default Profile Handling
+# Default / Active Profile Handling
 # ---------------------------------------------------------
 def _ensure_default_profile():
-    """Ensure at least one default profile exists and is valid."""
-    default_data = {
-        "player": {"name": "default", "gamer": "", "email": "", "xp": 0, "rank": "Beginner"},
-        "progress": {"completed": []},
-    }
-
-    if not PROFILES_FILE.exists():
-        PROFILES_FILE.write_text(yaml.safe_dump(default_data))
-        if not ACTIVE_PROFILE.exists():
-            ACTIVE_PROFILE.write_text("default")
+    """Ensure at least one default profile exists."""
+    if "default" in _state_cache or store.has_player("default"):
         return
+    store.put_player("default", DEFAULT_STATE)
 
-    # Recover from corruption
+
+def _active_name() -> str:
+    """Return the active profile, falling back to 'default' if it no longer exists."""
     try:
-        yaml.safe_load(PROFILES_FILE.read_text())
-    except Exception:
-        console.print("[yellow]⚠️ Default profile corrupted. Rebuilding...[/yellow]")
-        PROFILES_FILE.write_text(yaml.safe_dump(default_data))
+        name = ACTIVE_PROFILE.read_text().strip() or "default"
+    except FileNotFoundError:
+        name = "default"
+        PROFILES.mkdir(parents=True, exist_ok=True)
+        ACTIVE_PROFILE.write_text(name)
+
+    if name in _state_cache or store.has_player(name):
+        return name
+    _ensure_default_profile()
+    return "default"
 
 
 # ---------------------------------------------------------
@@ -53,73 +76,110 @@ def _ensure_default_profile():
 # ---------------------------------------------------------
 def load_state():
     """Load active profile state, ensuring defaults exist."""
-    _ensure_default_profile()
+    name = _active_name()
+    if name in _pending:
+        return copy.deepcopy(_pending[name])
 
-    try:
-        active_name = ACTIVE_PROFILE.read_text().strip()
-    except FileNotFoundError:
-        active_name = "default"
-        ACTIVE_PROFILE.write_text(active_name)
+    version = store.data_version()
+    hit = _state_cache.get(name)
+    if hit and hit[0] == version:
+        return copy.deepcopy(hit[1])
 
-    profile_file = PROFILES / f"{active_name}.yaml"
-    if not profile_file.exists():
+    data = store.get_player(name)
+    if data is None:
         _ensure_default_profile()
-        profile_file = PROFILES_FILE
+        name, data = "default", store.get_player("default")
+    _state_cache[name] = (store.data_version(), data)
+    _base[name] = data
+    _persisted_digest[name] = _digest(data)
+    return copy.deepcopy(data)
 
-    try:
-        data = yaml.safe_load(profile_file.read_text()) or {}
-    except Exception:
-        console.print(f"[yellow]⚠️ Profile '{active_name}' is corrupted. Restoring defaults.[/yellow]")
-        _ensure_default_profile()
-        data = yaml.safe_load(PROFILES_FILE.read_text())
 
-    return data
+def completed_set():
+    """Completions of the active profile as a CompletionSet bitmap."""
+    name = _active_name()
+    if name in _pending:
+        return CompletionSet.from_ids(_pending[name].get("progress", {}).get("completed", []))
+    return store.get_completions(name)
 
 
 def save_state(state):
-    """Persist profile state and queue for local sync."""
-    global _last_saved_state
-    _ensure_default_profile()
+    """
+    Stage profile state for writing. Repeated saves within one command are
+    coalesced into a single store transaction (and one sync snapshot) at exit.
+    """
+    global _flush_registered
+    name = _active_name()
+    if name not in _pending and _digest(state) == _persisted_digest.get(name):
+        return  # unchanged since it was loaded
 
-    # Avoid redundant writes
-    if state == _last_saved_state:
-        return
-    _last_saved_state = state.copy()
+    _pending[name] = copy.deepcopy(state)
+    if not _flush_registered:
+        atexit.register(flush)
+        _flush_registered = True
 
-    try:
-        active_name = ACTIVE_PROFILE.read_text().strip()
-    except FileNotFoundError:
-        active_name = "default"
-        ACTIVE_PROFILE.write_text(active_name)
 
-    profile_file = PROFILES / f"{active_name}.yaml"
-    profile_file.write_text(yaml.safe_dump(state))
+def flush():
+    """
+    Write staged states that differ from what was loaded, as deltas against the
+    current stored row, then queue one sync snapshot each.
+    """
+    while _pending:
+        name, state = _pending.popitem()
+        digest = _digest(state)
+        if digest == _persisted_digest.get(name):
+            continue
+        try:
+            if name in _base:
+                store.merge_player(name, _base.pop(name), state)
+            else:
+                store.put_player(name, state)
+        except Exception as e:
+            console.print(f"[yellow]⚠️ Failed to save profile '{name}': {e}[/yellow]")
+            continue
+        _persisted_digest.pop(name, None)
+        _state_cache.pop(name, None)
+        state = store.get_player(name) or state
 
-    # Queue local sync file (but don’t push online yet)
-    sync_profile_to_github(state, quiet=True)
+        # Queue local sync file (but don’t push online yet)
+        sync_profile_to_github(state, quiet=True)
 
 
 # ---------------------------------------------------------
 # 🌐 Global Leaderboard Sync (Recovery)
 # ---------------------------------------------------------
+LEADERBOARD_URL = os.getenv(
+    "DEVOPSMIND_LEADERBOARD_URL",
+    "https://raw.githubusercontent.com/InfraForgeLabs/DevOpsMind/leaderboard/leaderboard/leaderboard.json",
+)
+
+
+def _fetch_leaderboard(quiet: bool = False):
+    """The published leaderboard.json, or None (with a warning unless quiet) if it can't be had."""
+    problem = None
+    try:
+        r = session().get(LEADERBOARD_URL, timeout=5)
+        if r.status_code != 200:
+            problem = f"Could not fetch leaderboard (HTTP {r.status_code})."
+        else:
+            try:
+                return r.json()
+            except json.JSONDecodeError:
+                problem = "Malformed leaderboard JSON."
+    except Exception as e:
+        problem = f"Network issue while fetching leaderboard: {e}"
+    if not quiet:
+        console.print(f"[yellow]⚠️ {problem}[/yellow]")
+    return None
+
+
 def sync_profile_from_github(email: str):
     """Fetch XP and progress from global leaderboard using SHA256(email) hash."""
     if not email:
         return None
 
-    url = "https://raw.githubusercontent.com/InfraForgeLabs/DevOpsMind/leaderboard/leaderboard/leaderboard.json"
-    try:
-        r = requests.get(url, timeout=5)
-        if r.status_code != 200:
-            console.print(f"[yellow]⚠️ Could not fetch leaderboard (HTTP {r.status_code}).[/yellow]")
-            return None
-        try:
-            leaderboard = r.json()
-        except json.JSONDecodeError:
-            console.print("[yellow]⚠️ Malformed leaderboard JSON.[/yellow]")
-            return None
-    except Exception as e:
-        console.print(f"[yellow]⚠️ Network issue while fetching leaderboard: {e}[/yellow]")
+    leaderboard = _fetch_leaderboard()
+    if leaderboard is None:
         return None
 
     # 🔒 Compute SHA256 hash of email for lookup
@@ -140,13 +200,81 @@ def sync_profile_from_github(email: str):
     return None
 
 
+def apply_resync(leaderboard=None) -> list:
+    """
+    Honour the leaderboard's resync list: the builder saw a gap in this install's
+    deltas and dropped them. Matching profiles forget their watermark and queue a
+    full snapshot, and the sent ledger is cleared so nothing is skipped as a dupe.
+    Returns the names of the profiles that were reset.
+    """
+    if leaderboard is None:
+        leaderboard = _fetch_leaderboard(quiet=True)  # offline: nothing to honour
+    wanted = leaderboard.get("resync") if isinstance(leaderboard, dict) else None
+    if not wanted:
+        return []
+    try:
+        source = store.install_id()
+        hashes = {r.get("email_hash") for r in wanted if isinstance(r, dict) and r.get("source") == source}
+        names = []
+        for name in store.player_names() if hashes else []:
+            state = store.get_player(name) or {}
+            email = str(state.get("player", {}).get("email", "")).strip().lower()
+            if not email or hashlib.sha256(email.encode()).hexdigest() not in hashes:
+                continue
+            if store.unsynced(name)[0] is not None:  # else already bootstrapping
+                names.append(name)
+        for name in resync(names):
+            console.print(f"[yellow]🔁 Leaderboard lost some of {name}'s progress; queued a full resync.[/yellow]")
+        return names
+    except Exception as e:
+        console.print(f"[yellow]⚠️ Could not apply leaderboard resync: {e}[/yellow]")
+        return []
+
+
+def resync(names: list) -> list:
+    """
+    Queue a full snapshot for each profile, dropping its watermark, and clear
+    the sent ledger so the upload can't be skipped as already delivered.
+    """
+    if not names:
+        return names
+    for name in names:
+        store.reset_sync(name)
+    store.clear_sent()
+    for name in names:
+        sync_profile_to_github(store.get_player(name), quiet=True)
+    return names
+
+
 # ---------------------------------------------------------
 # ☁️ Queue Local Profile for GitHub Sync
 # ---------------------------------------------------------
+def sync_payload(name: str, completed: CompletionSet) -> dict:
+    """
+    Completion fields for a leaderboard snapshot. Once the relay has acknowledged a
+    snapshot for this profile, only the completions since that watermark are sent
+    (gains, each with its seq and XP); before that, the full bitmap bootstraps it.
+    """
+    try:
+        mark, seq, gains = store.unsynced(name)
+        source = store.install_id()
+    except Exception:
+        return to_payload(completed)
+
+    if mark is None:
+        return {**to_payload(completed), "source": source, "seq": seq}
+    return {
+        "source": source,
+        "since": mark,
+        "seq": max(seq, mark),
+        "gains": [{"seq": s, "id": ch_id, "xp": xp} for s, ch_id, xp in gains],
+    }
+
+
 def sync_profile_to_github(state: dict, quiet: bool = False):
     """
     Queue profile for leaderboard sync (offline-first).
-    Creates YAML snapshot in ~/.devopsmind/.pending_sync/
+    Appends a snapshot to ~/.devopsmind/sync_queue.log
     """
     player = state.get("player", {})
     name = player.get("name", "unknown")
@@ -154,26 +282,23 @@ def sync_profile_to_github(state: dict, quiet: bool = False):
     email = player.get("email", "")
     xp = player.get("xp", 0)
     rank = player.get("rank", "Beginner")
-    completed = state.get("progress", {}).get("completed", [])
+    completed = CompletionSet.from_ids(state.get("progress", {}).get("completed", []))
 
-    # Append timestamped snapshot — allows multiple offline wins
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    safe_name = name.replace(" ", "_").replace("/", "_")
+    # Supersedes any older snapshot queued for this player
     out = {
         "name": name,
         "gamer": gamer,
         "email": email,
         "xp": xp,
         "rank": rank,
-        "completed": completed,
+        **sync_payload(name, completed),
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
     }
 
     try:
-        path = PENDING_SYNC_DIR / f"{safe_name}_{timestamp}.yaml"
-        path.write_text(yaml.safe_dump(out))
+        entry = enqueue(out)
         if not quiet and os.getenv("DEVOPSMIND_VERBOSE_SYNC", "0") == "1":
-            console.print(f"[dim]🧠 Queued leaderboard sync: {path.name}[/dim]")
+            console.print(f"[dim]🧠 Queued leaderboard sync: {label(entry)}[/dim]")
     except Exception as e:
         console.print(f"[yellow]⚠️ Failed to queue leaderboard sync: {e}[/yellow]")
 
@@ -183,8 +308,7 @@ def sync_profile_to_github(state: dict, quiet: bool = False):
 # ---------------------------------------------------------
 def create(name: str):
     """Create new profile, restoring XP if found on leaderboard."""
-    profile_file = PROFILES / f"{name}.yaml"
-    if profile_file.exists():
+    if store.has_player(name):
         console.print(Panel.fit(f"⚠️ Profile '{name}' already exists.", border_style="yellow"))
         return
 
@@ -210,7 +334,8 @@ def create(name: str):
             "progress": {"completed": []},
         }
 
-    profile_file.write_text(yaml.safe_dump(data))
+    store.put_player(name, data)
+    PROFILES.mkdir(parents=True, exist_ok=True)
     ACTIVE_PROFILE.write_text(name)
     console.print(Panel.fit(f"✅ Profile '{name}' ({gamer}) created!", border_style="green"))
 
@@ -220,12 +345,11 @@ def create(name: str):
 
 def login(name: str):
     """Switch active profile and refresh XP from leaderboard."""
-    profile_file = PROFILES / f"{name}.yaml"
-    if not profile_file.exists():
+    data = store.get_player(name)
+    if data is None:
         console.print(Panel.fit(f"❌ Profile '{name}' not found.", border_style="red"))
         return
 
-    data = yaml.safe_load(profile_file.read_text()) or {}
     email = data.get("player", {}).get("email", "")
 
     recovered = sync_profile_from_github(email) if email else None
@@ -234,31 +358,24 @@ def login(name: str):
         data["player"]["xp"] = recovered.get("xp", data["player"].get("xp", 0))
         data["player"]["rank"] = recovered.get("rank", data["player"].get("rank", "Beginner"))
         data["progress"]["completed"] = recovered.get("completed", data.get("progress", {}).get("completed", []))
-        profile_file.write_text(yaml.safe_dump(data))
+        store.put_player(name, data)
         sync_profile_to_github(data, quiet=True)
 
+    PROFILES.mkdir(parents=True, exist_ok=True)
     ACTIVE_PROFILE.write_text(name)
     console.print(Panel.fit(f"👤 Switched to profile: {name}", border_style="cyan"))
 
 
 def list_profiles():
     """List available profiles and highlight the active one."""
-    _ensure_default_profile()
-    active = ACTIVE_PROFILE.read_text().strip()
+    active = _active_name()
     console.print("[bold cyan]Available Profiles:[/bold cyan]")
 
-    profiles = sorted(PROFILES.glob("*.yaml"))
-    for f in profiles:
-        if f.name.startswith("."):
-            continue
-        mark = "⭐" if f.stem == active else " "
-        console.print(f" {mark} {f.stem}")
+    for name in store.player_names():
+        mark = "⭐" if name == active else " "
+        console.print(f" {mark} {name}")
 
 
 def current_profile_name() -> str:
     """Return the active profile name."""
-    _ensure_default_profile()
-    try:
-        return ACTIVE_PROFILE.read_text().strip()
-    except FileNotFoundError:
-        return "default"
+    return _active_name()
@@ -1,8 +1,9 @@
 from pathlib import Path
-import yaml
-import re
 from datetime import datetime, timezone
-from .profiles import load_state, save_state, sync_profile_to_github
+from .profiles import current_profile_name, flush, load_state, sync_payload
+from . import store
+from .bitmap import CompletionSet
+from .syncqueue import enqueue, label
 from rich.console import Console
 
 console = Console()
@@ -10,25 +11,18 @@ console = Console()
 # ---------------------------------------------------------
 # Constants
 # ---------------------------------------------------------
-PENDING_SYNC_DIR = Path.home() / ".devopsmind" / ".pending_sync"
-PENDING_SYNC_DIR.mkdir(parents=True, exist_ok=True)
+PENDING_SYNC_DIR = Path.home() / ".devopsmind" / ".pending_sync"  # legacy queue, see syncqueue
 
 
 # ---------------------------------------------------------
 # Record Completion
 # ---------------------------------------------------------
 def record_completion(ch_id: str, xp: int):
-    """Record challenge completion locally and persist profile state."""
-    state = load_state()
-    player = state["player"]
-    progress = state["progress"]
-
-    if ch_id not in progress.get("completed", []):
-        progress.setdefault("completed", []).append(ch_id)
-        player["xp"] = player.get("xp", 0) + xp
+    """Record challenge completion locally (one row insert plus an XP event)."""
+    flush()  # staged whole-state writes must land before the in-place update
+    if store.add_completion(current_profile_name(), ch_id, xp):
         console.print(f"[dim]🧠 Recorded completion of '{ch_id}' (+{xp} XP).[/dim]")
-        save_state(state)
-        _queue_for_sync(state)
+        _queue_for_sync(load_state())
     else:
         console.print(f"[dim]🧠 Challenge '{ch_id}' already completed.[/dim]")
 
@@ -39,43 +33,33 @@ def record_completion(ch_id: str, xp: int):
 def _queue_for_sync(state: dict):
     """
     Queue local profile snapshot for leaderboard sync (offline-first).
-    Writes YAML to ~/.devopsmind/.pending_sync/
+    Appends to ~/.devopsmind/sync_queue.log
     """
     player = state.get("player", {})
     progress = state.get("progress", {})
 
+    name = player.get("name") or current_profile_name()
     gamer = player.get("gamer") or player.get("name") or player.get("email", "").split("@")[0]
     email = str(player.get("email", "")).strip()
     xp = int(player.get("xp", 0))
     rank = player.get("rank", "Beginner")
-    completed = progress.get("completed", [])
+    completed = CompletionSet.from_ids(progress.get("completed", []))
 
     timestamp = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
-    safe_gamer = re.sub(r"[^a-zA-Z0-9_-]", "", gamer) or "player"
-
-    # 🧩 Prevent duplicate queueing within the same minute
-    recent = list(PENDING_SYNC_DIR.glob(f"{safe_gamer}_*.yaml"))
-    if any(timestamp[:16] in f.name for f in recent):
-        console.print(f"[dim]⏭️ Already queued recent sync for {safe_gamer}.[/dim]")
-        return
 
     out = {
+        "name": name,
         "gamer": gamer,
         "username": email or gamer,
         "xp": xp,
         "rank": rank,
-        "completed": completed,
+        **sync_payload(name, completed),
         "email": email,
         "timestamp": timestamp,
     }
 
     try:
-        file_name = f"{safe_gamer}_{timestamp.replace(':', '-')}.yaml"
-        path = PENDING_SYNC_DIR / file_name
-        path.write_text(yaml.safe_dump(out, sort_keys=False))
-        console.print(f"[dim]🧠 Queued XP sync: {path.name}[/dim]")
+        entry = enqueue(out)
+        console.print(f"[dim]🧠 Queued XP sync: {label(entry)}[/dim]")
     except Exception as e:
         console.print(f"[yellow]⚠️ Failed to queue sync: {e}[/yellow]")
-
-    # Local GitHub profile mirror (optional, no network requirement)
-    sync_profile_to_github(state, quiet=True)
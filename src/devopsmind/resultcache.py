@@ -0,0 +1,143 @@
+from __future__ import annotations
+from pathlib import Path
+from fnmatch import fnmatch
+import hashlib, json, os
+from typing import Dict, Any, List, Tuple
+
+# ---------------------------------------------------------
+# Constants
+# ---------------------------------------------------------
+CACHE_DIR = Path.home() / ".devopsmind" / "cache" / "results"  # one small file per workspace
+LEGACY_CACHE_FILE = Path.home() / ".devopsmind" / "cache" / "results.json"
+MAX_RESULTS = 20       # per workspace
+MAX_WORKSPACES = 200
+SKIP_DIRS = {"__pycache__", ".pytest_cache"}
+
+
+def _path(workspace_dir: Path) -> Path:
+    ws = str(Path(workspace_dir).resolve())
+    return CACHE_DIR / f"{hashlib.sha256(ws.encode()).hexdigest()[:24]}.json"
+
+
+def _load(workspace_dir: Path) -> Dict[str, Any]:
+    path = _path(workspace_dir)
+    try:
+        data = json.loads(path.read_text())
+        if isinstance(data, dict) and "results" in data and "files" in data:
+            return {**data, "path": str(path)}
+    except Exception:
+        pass
+    return {"results": {}, "files": {}, "path": str(path)}
+
+
+def _prune():
+    """Keep the MAX_WORKSPACES most recently used workspace files."""
+    LEGACY_CACHE_FILE.unlink(missing_ok=True)
+    try:
+        files = sorted(CACHE_DIR.glob("*.json"), key=lambda f: f.stat().st_mtime, reverse=True)
+    except OSError:
+        return
+    for f in files[MAX_WORKSPACES:]:
+        f.unlink(missing_ok=True)
+
+
+def _save(data: Dict[str, Any]):
+    results = data["results"]
+    for key in list(results)[:-MAX_RESULTS]:
+        del results[key]
+    path = Path(data["path"])
+    try:
+        is_new = not path.exists()
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"results": results, "files": data["files"]}))
+        os.replace(tmp, path)
+        if is_new:
+            _prune()
+    except Exception:
+        pass
+
+
+# ---------------------------------------------------------
+# Workspace Fingerprint
+# ---------------------------------------------------------
+def fingerprint(workspace_dir: Path, patterns: List[str] | None = None, memo: Dict[str, Any] | None = None) -> str:
+    """
+    Hash the workspace inputs a validator can read: every file and directory
+    (including .git and empty ones) with its mode, or only those matching the
+    challenge's `fingerprint:` globs, so a chmod or mkdir fix changes the key.
+    Per-file hashes are reused from memo while a file's size and mtime are unchanged.
+    """
+    memo = {} if memo is None else memo
+    seen = {}
+    h = hashlib.sha256()
+    for root, dirs, files in os.walk(workspace_dir):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+        for d in dirs:
+            path = Path(root) / d
+            rel = str(path.relative_to(workspace_dir))
+            if patterns and not any(fnmatch(rel, p) for p in patterns):
+                continue
+            try:
+                h.update(f"{rel}/\0{path.lstat().st_mode:o}\n".encode())
+            except OSError:
+                continue
+        for f in sorted(files):
+            if f.startswith(".devopsmind-manifest"):
+                continue
+            path = Path(root) / f
+            rel = str(path.relative_to(workspace_dir))
+            if patterns and not any(fnmatch(rel, p) for p in patterns):
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            hit = memo.get(rel)
+            if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+                digest = hit[2]
+            else:
+                try:
+                    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+                except OSError:
+                    continue
+            seen[rel] = [st.st_size, st.st_mtime_ns, digest]
+            h.update(f"{rel}\0{st.st_mode:o}\0{digest}\n".encode())
+
+    memo.clear()
+    memo.update(seen)
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------
+# Result Lookup / Store
+# ---------------------------------------------------------
+def cache_key(validator: Path, workspace_dir: Path, context: Dict[str, Any] | None,
+              patterns: List[str] | None = None) -> Tuple[str, Dict[str, Any]]:
+    """Return (key, data) for a validator run; data is passed back to store()."""
+    data = _load(workspace_dir)
+    memo = data["files"]
+    validator_sha = hashlib.sha256(Path(validator).read_bytes()).hexdigest()
+    ctx = json.dumps(context or {}, sort_keys=True)
+    key = f"{validator_sha}:{fingerprint(workspace_dir, patterns, memo)}:{hashlib.sha256(ctx.encode()).hexdigest()[:16]}"
+    return key, data
+
+
+def lookup(key: str, data: Dict[str, Any]) -> Tuple[bool, str] | None:
+    hit = data["results"].get(key)
+    return (bool(hit[0]), str(hit[1])) if hit else None
+
+
+def is_verdict(ok: bool, msg: str) -> bool:
+    """
+    True for a real pass/fail of the learner's work. Timeouts, resource kills,
+    crashes and missing tools (the "Validator ..." messages) depend on the
+    environment, so they are never cached.
+    """
+    return bool(ok) or not str(msg).startswith("Validator ")
+
+
+def store(key: str, data: Dict[str, Any], ok: bool, msg: str):
+    data["results"].pop(key, None)
+    data["results"][key] = [bool(ok), str(msg)]
+    _save(data)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+from pathlib import Path
+import json, os, signal, subprocess, sys
+from typing import Dict, Any, Tuple
+
+# ---------------------------------------------------------
+# Constants
+# ---------------------------------------------------------
+DEFAULT_TIMEOUT_S = 120
+MEMORY_LIMIT_MB = int(os.getenv("DEVOPSMIND_SANDBOX_MEM_MB", "2048"))
+RESULT_PREFIX = "__DEVOPSMIND_RESULT__ "
+
+
+# ---------------------------------------------------------
+# Parent Side
+# ---------------------------------------------------------
+def _set_limits(cpu_s: int, mem_bytes: int):
+    """preexec_fn: cap CPU time and address space for the validator and its children."""
+    import resource
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_s, cpu_s + 1))
+    if mem_bytes > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (mem_bytes, mem_bytes))
+
+
+def _kill_group(proc: subprocess.Popen):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, AttributeError):
+        pass
+
+
+def run_sandboxed(
+    validator: Path,
+    workspace_dir: Path,
+    context: Dict[str, Any] | None = None,
+    timeout_s: int | None = None,
+) -> Tuple[bool, str]:
+    """
+    Run a validator in a child process inside workspace_dir.
+    The child gets its own process group, a wall-clock timeout, and on POSIX
+    RLIMIT_CPU / RLIMIT_AS caps; the whole group is killed once it is done.
+    """
+    timeout_s = int(timeout_s or DEFAULT_TIMEOUT_S)
+    env = os.environ.copy()
+    pkg_root = str(Path(__file__).resolve().parents[1])
+    env["PYTHONPATH"] = os.pathsep.join(p for p in [pkg_root, env.get("PYTHONPATH", "")] if p)
+
+    kwargs = {}
+    if os.name == "posix":
+        kwargs["start_new_session"] = True
+        kwargs["preexec_fn"] = lambda: _set_limits(timeout_s, MEMORY_LIMIT_MB * 1024 * 1024)
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "devopsmind.sandbox", str(validator)],
+        cwd=workspace_dir,
+        env=env,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        **kwargs,
+    )
+    timed_out = False
+    try:
+        out, err = proc.communicate(json.dumps(context or {}).encode(), timeout=timeout_s)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        _kill_group(proc)
+        out, err = proc.communicate()
+    finally:
+        _kill_group(proc)  # reap anything the learner's script left behind
+    if timed_out:
+        return False, f"Validator timed out after {timeout_s}s."
+
+    for line in reversed(out.decode(errors="replace").splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            try:
+                ok, msg = json.loads(line[len(RESULT_PREFIX):])
+                return bool(ok), str(msg)
+            except Exception:
+                break
+
+    if proc.returncode == -getattr(signal, "SIGXCPU", -1):
+        return False, f"Validator exceeded its CPU limit ({timeout_s}s)."
+    if proc.returncode == -signal.SIGKILL:
+        # Not our wall-clock kill (handled above): the OOM killer, or the hard CPU rlimit
+        return False, f"Validator was killed (memory limit {MEMORY_LIMIT_MB} MB or hard CPU limit)."
+    tail = err.decode(errors="replace").strip().splitlines()[-1:] or ["no output"]
+    return False, f"Validator exited with code {proc.returncode}: {tail[0]}"
+
+
+# ---------------------------------------------------------
+# Child Side (python -m devopsmind.sandbox <validator.py>)
+# ---------------------------------------------------------
+def _child_main(validator: str):
+    from .validators import load_validator, call_validate
+
+    context = json.loads(sys.stdin.read() or "{}")
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr  # validator prints must not corrupt the result line
+    try:
+        mod = load_validator(Path(validator))
+        if not hasattr(mod, "validate"):
+            ok, msg = False, "Validator missing."
+        else:
+            ok, msg = call_validate(mod, context)
+    except MemoryError:
+        ok, msg = False, f"Validator exceeded its memory limit ({MEMORY_LIMIT_MB} MB)."
+    except Exception as e:
+        ok, msg = False, f"Validator threw an exception: {e}"
+    finally:
+        sys.stdout = real_stdout
+
+    real_stdout.write(RESULT_PREFIX + json.dumps([bool(ok), str(msg)]) + "\n")
+    real_stdout.flush()
+
+
+if __name__ == "__main__":
+    _child_main(sys.argv[1])
@@ -0,0 +1,429 @@
+from __future__ import annotations
+from pathlib import Path
+from datetime import datetime, timezone
+import json, os, sqlite3, uuid
+from typing import Dict, Any, List, Tuple
+
+from .bitmap import CompletionSet
+
+# ---------------------------------------------------------
+# Constants
+# ---------------------------------------------------------
+BASE_DIR = Path.home() / ".devopsmind"
+DB_FILE = BASE_DIR / "devopsmind.db"
+LEGACY_PROFILES = BASE_DIR / "profiles"
+PLAYER_COLUMNS = ("name", "gamer", "email", "xp", "rank")
+SCHEMA_VERSION = 2
+SENT_LEDGER_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    name  TEXT PRIMARY KEY,
+    gamer TEXT NOT NULL DEFAULT '',
+    email TEXT NOT NULL DEFAULT '',
+    xp    INTEGER NOT NULL DEFAULT 0,
+    rank  TEXT NOT NULL DEFAULT 'Beginner',
+    extra TEXT NOT NULL DEFAULT '{}',
+    completed_bits  TEXT NOT NULL DEFAULT '0',
+    completed_extra TEXT NOT NULL DEFAULT '[]'
+);
+CREATE TABLE IF NOT EXISTS completions (
+    player       TEXT NOT NULL,
+    challenge_id TEXT NOT NULL,
+    completed_at TEXT NOT NULL,
+    PRIMARY KEY (player, challenge_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS xp_events (
+    id           INTEGER PRIMARY KEY,
+    player       TEXT NOT NULL,
+    challenge_id TEXT,
+    xp           INTEGER NOT NULL,
+    at           TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS xp_events_player ON xp_events (player, id);
+CREATE TABLE IF NOT EXISTS sync_marks (
+    player    TEXT PRIMARY KEY,
+    acked_seq INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sent_payloads (
+    digest TEXT PRIMARY KEY,
+    at     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_conn: sqlite3.Connection | None = None
+_conn_pid: int | None = None
+_local_writes = 0  # PRAGMA data_version does not move for our own commits
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+# ---------------------------------------------------------
+# Connection / Migration
+# ---------------------------------------------------------
+def connect() -> sqlite3.Connection:
+    """Return this process's connection, creating the database on first use."""
+    global _conn, _conn_pid
+    if _conn is not None and _conn_pid == os.getpid():
+        return _conn
+
+    # A connection inherited across fork() must not be reused by the child
+    DB_FILE.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(DB_FILE), timeout=10, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    _conn, _conn_pid = conn, os.getpid()
+    _upgrade(conn)
+    _migrate_yaml(conn)
+    return conn
+
+
+def _upgrade(conn: sqlite3.Connection):
+    """Bring databases created by older releases up to SCHEMA_VERSION."""
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+    with transaction(conn):
+        cols = {r["name"] for r in conn.execute("PRAGMA table_info(players)")}
+        if "completed_bits" not in cols:
+            conn.execute("ALTER TABLE players ADD COLUMN completed_bits TEXT NOT NULL DEFAULT '0'")
+            conn.execute("ALTER TABLE players ADD COLUMN completed_extra TEXT NOT NULL DEFAULT '[]'")
+            for (name,) in conn.execute("SELECT name FROM players").fetchall():
+                done = CompletionSet.from_ids(r[0] for r in conn.execute(
+                    "SELECT challenge_id FROM completions WHERE player = ?", (name,)))
+                _set_completions(conn, name, done)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _migrate_yaml(conn: sqlite3.Connection):
+    """One-time import of ~/.devopsmind/profiles/*.yaml (the files are left in place)."""
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'yaml_migrated'").fetchone():
+        return
+    import yaml
+
+    with transaction(conn):
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'yaml_migrated'").fetchone():
+            return
+        for pf in sorted(LEGACY_PROFILES.glob("*.yaml")) if LEGACY_PROFILES.exists() else []:
+            try:
+                data = yaml.safe_load(pf.read_text()) or {}
+            except Exception:
+                continue
+            if not isinstance(data, dict) or conn.execute(
+                "SELECT 1 FROM players WHERE name = ?", (pf.stem,)
+            ).fetchone():
+                continue
+            _write_player(conn, pf.stem, data)
+        conn.execute("INSERT INTO meta (key, value) VALUES ('yaml_migrated', ?)", (_now(),))
+
+
+class transaction:
+    """`with transaction(conn):` runs the block in BEGIN IMMEDIATE ... COMMIT."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        global _local_writes
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        _local_writes += 0 if exc_type else 1
+        return False
+
+
+def data_version() -> Tuple[int, int]:
+    """Changes whenever anyone (this process included) commits; used to validate caches."""
+    return connect().execute("PRAGMA data_version").fetchone()[0], _local_writes
+
+
+# ---------------------------------------------------------
+# Players
+# ---------------------------------------------------------
+def _set_completions(conn: sqlite3.Connection, name: str, done: CompletionSet):
+    conn.execute(
+        "UPDATE players SET completed_bits = ?, completed_extra = ? WHERE name = ?",
+        (done.encode(), json.dumps(sorted(done.extra)), name),
+    )
+
+
+def _write_player(conn: sqlite3.Connection, name: str, state: Dict[str, Any]):
+    player = dict(state.get("player") or {})
+    completed = list((state.get("progress") or {}).get("completed") or [])
+    extra = {k: v for k, v in player.items() if k not in PLAYER_COLUMNS}
+    done = CompletionSet.from_ids(completed)
+
+    conn.execute(
+        """INSERT INTO players (name, gamer, email, xp, rank, extra, completed_bits, completed_extra)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+           ON CONFLICT (name) DO UPDATE SET gamer = excluded.gamer, email = excluded.email,
+           xp = excluded.xp, rank = excluded.rank, extra = excluded.extra,
+           completed_bits = excluded.completed_bits, completed_extra = excluded.completed_extra""",
+        (
+            name,
+            str(player.get("gamer") or ""),
+            str(player.get("email") or ""),
+            int(player.get("xp") or 0),
+            str(player.get("rank") or "Beginner"),
+            json.dumps(extra),
+            done.encode(),
+            json.dumps(sorted(done.extra)),
+        ),
+    )
+
+    have = {r[0] for r in conn.execute("SELECT challenge_id FROM completions WHERE player = ?", (name,))}
+    want = set(completed)
+    now = _now()
+    conn.executemany(
+        "INSERT OR IGNORE INTO completions (player, challenge_id, completed_at) VALUES (?, ?, ?)",
+        [(name, ch_id, now) for ch_id in completed if ch_id not in have],
+    )
+    conn.executemany(
+        "DELETE FROM completions WHERE player = ? AND challenge_id = ?",
+        [(name, ch_id) for ch_id in have - want],
+    )
+
+
+def _read_player(conn: sqlite3.Connection, name: str) -> Dict[str, Any] | None:
+    row = conn.execute("SELECT * FROM players WHERE name = ?", (name,)).fetchone()
+    if not row:
+        return None
+    player = json.loads(row["extra"] or "{}")
+    player.update({k: row[k] for k in PLAYER_COLUMNS})
+    completed = _completions_of(row).ids()
+    return {"player": player, "progress": {"completed": completed}}
+
+
+def get_player(name: str) -> Dict[str, Any] | None:
+    """Return {"player": {...}, "progress": {"completed": [...]}} or None."""
+    return _read_player(connect(), name)
+
+
+def _completions_of(row: sqlite3.Row) -> CompletionSet:
+    return CompletionSet.decode(row["completed_bits"], json.loads(row["completed_extra"] or "[]"))
+
+
+def put_player(name: str, state: Dict[str, Any]):
+    """Upsert a whole profile state (player row plus completion set) in one transaction."""
+    conn = connect()
+    with transaction(conn):
+        _write_player(conn, name, state)
+
+
+def merge_player(name: str, base: Dict[str, Any], state: Dict[str, Any]):
+    """
+    Apply the edits that turned `base` into `state` on top of whatever is stored now,
+    inside one write transaction: XP moves by its delta, completions added or removed
+    since `base` are applied to the stored set, and changed fields overwrite.
+    Concurrent writers therefore never lose each other's increments.
+    """
+    conn = connect()
+    with transaction(conn):
+        current = _read_player(conn, name)
+        if current is None:
+            _write_player(conn, name, state)
+            return
+
+        old_p, new_p, cur_p = base.get("player") or {}, state.get("player") or {}, current["player"]
+        for key, value in new_p.items():
+            if key == "xp":
+                cur_p["xp"] = int(cur_p.get("xp") or 0) + int(value or 0) - int(old_p.get("xp") or 0)
+            elif old_p.get(key) != value:
+                cur_p[key] = value
+
+        old_c = CompletionSet.from_ids((base.get("progress") or {}).get("completed") or [])
+        new_c = CompletionSet.from_ids((state.get("progress") or {}).get("completed") or [])
+        done = (CompletionSet.from_ids(current["progress"]["completed"]) | (new_c - old_c)) - (old_c - new_c)
+        current["progress"]["completed"] = done.ids()
+        _write_player(conn, name, current)
+
+
+def update_player(name: str, **fields):
+    """Set individual player columns, e.g. update_player("bob", email="b@x.io")."""
+    global _local_writes
+    cols = [k for k in fields if k in PLAYER_COLUMNS and k != "name"]
+    if cols:
+        _local_writes += 1
+        connect().execute(
+            f"UPDATE players SET {', '.join(f'{c} = ?' for c in cols)} WHERE name = ?",
+            [fields[c] for c in cols] + [name],
+        )
+
+
+def has_player(name: str) -> bool:
+    return connect().execute("SELECT 1 FROM players WHERE name = ?", (name,)).fetchone() is not None
+
+
+def player_names() -> List[str]:
+    return [r[0] for r in connect().execute("SELECT name FROM players ORDER BY name")]
+
+
+def leaderboard_rows() -> List[Tuple[str, str, int, str]]:
+    """(name, gamer, xp, rank) for every local player, highest XP first."""
+    return [tuple(r) for r in connect().execute(
+        "SELECT name, gamer, xp, rank FROM players ORDER BY xp DESC, name"
+    )]
+
+
+# ---------------------------------------------------------
+# Completions
+# ---------------------------------------------------------
+def get_completions(name: str) -> CompletionSet:
+    """The player's completions as a bitmap, read from a single row."""
+    row = connect().execute(
+        "SELECT completed_bits, completed_extra FROM players WHERE name = ?", (name,)
+    ).fetchone()
+    return _completions_of(row) if row else CompletionSet()
+
+
+def completion_history(name: str) -> List[Tuple[str, str]]:
+    """(challenge_id, completed_at) pairs in completion order, for export."""
+    return [tuple(r) for r in connect().execute(
+        "SELECT challenge_id, completed_at FROM completions WHERE player = ? ORDER BY completed_at, challenge_id",
+        (name,),
+    )]
+
+
+def is_completed(name: str, ch_id: str) -> bool:
+    return ch_id in get_completions(name)
+
+
+def add_completion(name: str, ch_id: str, xp: int) -> bool:
+    """
+    Record a completion and its XP in one transaction.
+    Returns False (and changes nothing) if the challenge was already completed.
+    """
+    conn = connect()
+    now = _now()
+    with transaction(conn):
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO completions (player, challenge_id, completed_at) VALUES (?, ?, ?)",
+            (name, ch_id, now),
+        )
+        if cur.rowcount == 0:
+            return False
+        row = conn.execute("SELECT completed_bits, completed_extra FROM players WHERE name = ?", (name,)).fetchone()
+        if row:
+            done = _completions_of(row)
+            done.add(ch_id)
+            _set_completions(conn, name, done)
+        conn.execute("UPDATE players SET xp = xp + ? WHERE name = ?", (int(xp), name))
+        conn.execute(
+            "INSERT INTO xp_events (player, challenge_id, xp, at) VALUES (?, ?, ?, ?)",
+            (name, ch_id, int(xp), now),
+        )
+    return True
+
+
+# ---------------------------------------------------------
+# Meta
+# ---------------------------------------------------------
+def get_meta(key: str, default: str | None = None) -> str | None:
+    row = connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def set_meta(key: str, value: str):
+    conn = connect()
+    with transaction(conn):
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+
+# ---------------------------------------------------------
+# Leaderboard Sync Watermarks
+# ---------------------------------------------------------
+def install_id() -> str:
+    """Random id of this installation; leaderboard sequence numbers are scoped to it."""
+    conn = connect()
+    row = conn.execute("SELECT value FROM meta WHERE key = 'install_id'").fetchone()
+    if row:
+        return row[0]
+    with transaction(conn):
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('install_id', ?)", (uuid.uuid4().hex[:16],))
+        return conn.execute("SELECT value FROM meta WHERE key = 'install_id'").fetchone()[0]
+
+
+def unsynced(name: str) -> Tuple[int | None, int, List[Tuple[int, str, int]]]:
+    """
+    (acked watermark or None if never synced, newest seq, [(seq, challenge_id, xp), ...])
+    where seq is the xp_events id and the gains are the completions after the watermark.
+    """
+    conn = connect()
+    row = conn.execute("SELECT acked_seq FROM sync_marks WHERE player = ?", (name,)).fetchone()
+    mark = row[0] if row else None
+    newest = conn.execute("SELECT MAX(id) FROM xp_events WHERE player = ?", (name,)).fetchone()[0] or 0
+    gains = [tuple(r) for r in conn.execute(
+        "SELECT id, challenge_id, xp FROM xp_events "
+        "WHERE player = ? AND id > ? AND challenge_id IS NOT NULL ORDER BY id",
+        (name, mark or 0),
+    )] if mark is not None else []
+    return mark, newest, gains
+
+
+def mark_synced(name: str, seq: int):
+    """Advance the player's acked watermark to seq (it never moves backwards)."""
+    conn = connect()
+    with transaction(conn):
+        conn.execute(
+            """INSERT INTO sync_marks (player, acked_seq) VALUES (?, ?)
+               ON CONFLICT (player) DO UPDATE SET acked_seq = MAX(acked_seq, excluded.acked_seq)""",
+            (name, int(seq)),
+        )
+
+
+def reset_sync(name: str):
+    """Forget the player's watermark so the next snapshot is a full bootstrap."""
+    conn = connect()
+    with transaction(conn):
+        conn.execute("DELETE FROM sync_marks WHERE player = ?", (name,))
+
+
+# ---------------------------------------------------------
+# Sent-Payload Ledger
+# ---------------------------------------------------------
+def already_sent(digests: List[str]) -> set:
+    """The subset of the given content digests the relay has already acknowledged."""
+    if not digests:
+        return set()
+    marks = ",".join("?" * len(digests))
+    return {r[0] for r in connect().execute(
+        f"SELECT digest FROM sent_payloads WHERE digest IN ({marks})", list(digests)
+    )}
+
+
+def record_sent(digests: List[str]):
+    """Remember acknowledged digests, keeping the newest SENT_LEDGER_SIZE of them."""
+    if not digests:
+        return
+    conn = connect()
+    now = _now()
+    with transaction(conn):
+        conn.executemany(
+            "INSERT INTO sent_payloads (digest, at) VALUES (?, ?) "
+            "ON CONFLICT (digest) DO UPDATE SET at = excluded.at",
+            [(d, now) for d in digests],
+        )
+        conn.execute(
+            "DELETE FROM sent_payloads WHERE digest NOT IN "
+            "(SELECT digest FROM sent_payloads ORDER BY at DESC, rowid DESC LIMIT ?)",
+            (SENT_LEDGER_SIZE,),
+        )
+
+
+def clear_sent():
+    """Empty the sent ledger, so queued snapshots are uploaded even if seen before."""
+    conn = connect()
+    with transaction(conn):
+        conn.execute("DELETE FROM sent_payloads")
@@ -1,7 +1,11 @@
 from pathlib import Path
-import requests, yaml, os, hashlib
+import yaml, os, hashlib, json, subprocess, sys, time
+from typing import List, Tuple
 from rich.console import Console
 from datetime import datetime
+from .uploader import Upload, send_all
+from .locking import DRAIN_LOCK, locked
+from .syncqueue import LOG_FILE, Entry, ack, compact_if_needed, label, unsent
 
 console = Console()
 
@@ -9,67 +13,221 @@ WORKER_URL = os.getenv(
     "DEVOPSMIND_WORKER_URL",
     "https://devopsmind-relay.gauravchile05.workers.dev"
 )
+BATCH_URL = WORKER_URL.rstrip("/") + "/batch"
+MAX_BATCH_ITEMS = 100
+MAX_BATCH_BYTES = 60 * 1024  # the relay rejects bodies over 64 KiB
+NO_BATCH_RECHECK_S = 24 * 3600  # how long to skip /batch after finding a relay without it
 PENDING_DIR = Path.home() / ".devopsmind" / ".pending_sync"
+UPLOADER_LOG = Path.home() / ".devopsmind" / "uploader.log"
 
 
-def submit_pending(show_details=True):
-    """Submit all queued YAML files safely (offline-resilient)."""
-    if not PENDING_DIR.exists():
-        console.print("[yellow]⚠️ No pending sync folder found.[/yellow]")
-        return
+def submit_pending(show_details=True, force=False):
+    """
+    Submit all queued snapshots safely (offline-resilient). With force, every
+    local profile first queues a full snapshot and the sent ledger is cleared,
+    so progress the leaderboard lost is re-sent even if it looks delivered.
+    """
+    # Only one process drains the queue; others would POST the same files again
+    with locked(DRAIN_LOCK, blocking=False) as acquired:
+        if not acquired:
+            console.print("[dim]⏭️ Another devopsmind process is already submitting.[/dim]")
+            return
+        if force:
+            from . import store
+            from .profiles import resync
+            try:
+                names = resync(store.player_names())
+                console.print(f"[dim]🔁 Re-sending full snapshots for {len(names)} profile(s).[/dim]")
+            except Exception as e:
+                console.print(f"[yellow]⚠️ Could not queue full snapshots: {e}[/yellow]")
+        _submit_pending()
+        compact_if_needed()  # only now: compaction renumbers the entries acked above
+
 
-    files = list(PENDING_DIR.glob("*.yaml"))
-    if not files:
+def _submit_pending() -> bool:
+    """One pass over the queue; returns False if nothing could be delivered."""
+    entries = unsent()
+    if not entries:
         console.print("[green]✅ No pending submissions to send.[/green]")
-        return
+        return True
 
     console.print("\n╭──────────────────────────────────────────────────╮")
     console.print("│ 🚀 Submitting pending progress to leaderboard... │")
     console.print("╰──────────────────────────────────────────────────╯")
 
-    ok_count = 0
-    for f in files:
-        try:
-            data = f.read_text()
-            parsed = yaml.safe_load(data) or {}
-
-            # 🧠 Extract gamer/email for metadata headers
-            gamer = parsed.get("gamer") or parsed.get("name") or "unknown"
-            email = str(parsed.get("email", "")).strip().lower()
-            email_hash = hashlib.sha256(email.encode()).hexdigest() if email else None
-
-            headers = {
-                "Content-Type": "text/yaml",
-                "X-Gamer": gamer,
-                "X-Email-Hash": email_hash or "",
-            }
-
-            resp = requests.post(
-                WORKER_URL,
-                headers=headers,
-                data=data.encode("utf-8"),
-                timeout=10,
+    ok_count, unsupported = (0, entries) if _batch_known_unsupported() else _submit_batches(entries)
+    if unsupported:
+        # Only the batches the relay turned away; others may already be acked
+        console.print("[dim]🌐 Relay has no batch endpoint; submitting one by one.[/dim]")
+        ok_count += _submit_each(unsupported)
+
+    if ok_count:
+        console.print(f"\n[green]✅ Successfully submitted {ok_count} snapshot(s)![/green]\n")
+    else:
+        console.print("\n[yellow]⚠️ No successful submissions this round.[/yellow]\n")
+    return ok_count > 0
+
+
+# ---------------------------------------------------------
+# Background Submission (after play / validate)
+# ---------------------------------------------------------
+def submit_in_background():
+    """
+    Drain the queue in a detached process so the command returns immediately.
+    DEVOPSMIND_FOREGROUND_SYNC=1 submits inline instead (e.g. in CI).
+    """
+    if os.getenv("DEVOPSMIND_FOREGROUND_SYNC", "0") == "1":
+        submit_pending()
+        return
+    try:
+        UPLOADER_LOG.parent.mkdir(parents=True, exist_ok=True)
+        with open(UPLOADER_LOG, "a") as log:
+            subprocess.Popen(
+                [sys.executable, "-m", "devopsmind.submit", "--background"],
+                stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+                start_new_session=True, close_fds=True,
             )
+        console.print("[dim]🚀 Submitting in the background; see ~/.devopsmind/uploader.log[/dim]")
+    except OSError as e:
+        console.print(f"[yellow]⚠️ Could not start background submit ({e}); run 'devopsmind submit' later.[/yellow]")
 
-            if resp.status_code == 200:
-                try:
-                    rj = resp.json()
-                except Exception:
-                    rj = {}
 
-                if rj.get("ok"):
-                    console.print(f"✅ Submitted {f.name} → {rj.get('sha256', '')[:12]}")
-                    f.unlink(missing_ok=True)
-                    ok_count += 1
-                else:
-                    console.print(f"[yellow]🌐 Worker error: {rj.get('error', 'Unknown')}, kept for retry.[/yellow]")
-            else:
-                console.print(f"[yellow]🌐 Worker returned HTTP {resp.status_code}, keeping for retry.[/yellow]")
+def _queue_mark():
+    try:
+        st = LOG_FILE.stat()
+        return st.st_size, st.st_mtime_ns
+    except FileNotFoundError:
+        return None
 
-        except Exception as e:
-            console.print(f"[dim]🌐 Network error: {e}[/dim]")
 
-    if ok_count:
-        console.print(f"\n[green]✅ Successfully submitted {ok_count} file(s)![/green]\n")
-    else:
-        console.print("\n[yellow]⚠️ No successful submissions this round.[/yellow]\n")
+def _drain_in_background():
+    """
+    Body of the detached uploader. Only one drains at a time (DRAIN_LOCK); a
+    worker that loses the race just exits, so the holder re-checks the queue
+    after releasing the lock and goes round again if anything was appended.
+    """
+    while True:
+        with locked(DRAIN_LOCK, blocking=False) as acquired:
+            if not acquired:
+                return
+            mark = _queue_mark()
+            console.print(f"[dim]{datetime.now():%Y-%m-%d %H:%M:%S} background submit (pid {os.getpid()})[/dim]")
+            delivered = _submit_pending()
+            compact_if_needed()
+        if not delivered or _queue_mark() == mark:
+            return  # offline: the next play or 'devopsmind submit' retries
+
+
+# ---------------------------------------------------------
+# Batch Protocol (POST /batch, NDJSON, per-item sha256 acks)
+# ---------------------------------------------------------
+def _ndjson_line(snapshot: dict) -> str:
+    return json.dumps(snapshot, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def pack(entries: List[Entry]) -> List[List[Tuple[Entry, str]]]:
+    """Group entries into NDJSON batches within the relay's item and size limits."""
+    batches, batch, size = [], [], 0
+    for entry in entries:
+        line = _ndjson_line(entry.snapshot)
+        n = len(line.encode()) + 1
+        if batch and (len(batch) >= MAX_BATCH_ITEMS or size + n > MAX_BATCH_BYTES):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append((entry, line))
+        size += n
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _no_batch_key() -> str:
+    return f"no_batch:{BATCH_URL}"
+
+
+def _batch_known_unsupported() -> bool:
+    """True if this relay recently turned out to lack /batch (re-checked daily)."""
+    try:
+        from . import store
+        return time.time() - float(store.get_meta(_no_batch_key(), "0")) < NO_BATCH_RECHECK_S
+    except Exception:
+        return False
+
+
+def _remember_no_batch():
+    try:
+        from . import store
+        store.set_meta(_no_batch_key(), str(time.time()))
+    except Exception:
+        pass
+
+
+def _submit_batches(entries: List[Entry]) -> Tuple[int, List[Entry]]:
+    """
+    Send the queue as NDJSON batches: one request (and one relay dispatch) per batch.
+    Returns (snapshots acknowledged, entries of batches the relay can't handle): those
+    answered 404/405, or a legacy relay's plain {ok, sha256} reply with no per-item acks,
+    which took the whole body as one submission.
+    """
+    ok_count, unsupported = 0, []
+
+    def build(batch):
+        body = "".join(line + "\n" for _, line in batch)
+        return Upload(BATCH_URL, body.encode("utf-8"), {"Content-Type": "application/x-ndjson"})
+
+    def report(out):
+        nonlocal ok_count
+        if out.status in (404, 405) or (out.ok and "acks" not in out.reply):
+            unsupported.extend(e for e, _ in out.item)
+            return
+        if not out.ok:
+            console.print(f"[yellow]🌐 Batch of {len(out.item)} not accepted: {out.error}, kept for retry.[/yellow]")
+            return
+        acked = {a.get("sha256") for a in out.reply.get("acks", [])}
+        done = [e for e, line in out.item if hashlib.sha256(line.encode()).hexdigest() in acked]
+        ack(done)
+        ok_count += len(done)
+        for e in done:
+            console.print(f"✅ Submitted {label(e)}")
+        if len(done) < len(out.item):
+            console.print(f"[yellow]🌐 {len(out.item) - len(done)} snapshot(s) not acknowledged, kept for retry.[/yellow]")
+
+    send_all(pack(entries), build, report)
+    if unsupported:
+        _remember_no_batch()
+    return ok_count, unsupported
+
+
+# ---------------------------------------------------------
+# Single-Snapshot Protocol (older relays)
+# ---------------------------------------------------------
+def _submit_each(entries: List[Entry]) -> int:
+    def build(entry):
+        parsed = entry.snapshot
+
+        # 🧠 Extract gamer/email for metadata headers
+        gamer = parsed.get("gamer") or parsed.get("name") or "unknown"
+        email = str(parsed.get("email", "")).strip().lower()
+        email_hash = hashlib.sha256(email.encode()).hexdigest() if email else None
+
+        headers = {
+            "Content-Type": "text/yaml",
+            "X-Gamer": gamer,
+            "X-Email-Hash": email_hash or "",
+        }
+        return Upload(WORKER_URL, yaml.safe_dump(parsed, sort_keys=False).encode("utf-8"), headers)
+
+    def report(out):
+        if out.ok:
+            console.print(f"✅ Submitted {label(out.item)} → {out.reply.get('sha256', '')[:12]}")
+            ack([out.item])
+        elif out.status is None:
+            console.print(f"[dim]🌐 Network error for {label(out.item)}: {out.error}[/dim]")
+        else:
+            console.print(f"[yellow]🌐 Worker error for {label(out.item)}: {out.error}, kept for retry.[/yellow]")
+
+    return sum(1 for out in send_all(entries, build, report) if out.ok)
+
+
+if __name__ == "__main__" and "--background" in sys.argv[1:]:
+    _drain_in_background()
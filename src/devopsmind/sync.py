@@ -6,6 +6,9 @@ from rich.table import Table
 from datetime import datetime
 from .constants import BUNDLED_CHALLENGES, CHALLENGE_DIR
 from .profiles import load_state, save_state
+from .bitmap import CompletionSet, from_payload
+from .locking import DRAIN_LOCK, locked
+from .syncqueue import ack, compact_if_needed, label, pending
 
 console = Console()
 
@@ -14,8 +17,6 @@ def sync_default():
     console.print(Panel.fit("🧠 Syncing DevOpsMind Challenges", border_style="cyan"))
 
     CHALLENGE_DIR.mkdir(parents=True, exist_ok=True)
-    pending_dir = Path.home() / ".devopsmind" / ".pending_sync"
-    pending_dir.mkdir(parents=True, exist_ok=True)
 
     # ---------------------------------------------------------
     # 🧩 Merge queued XP & completed challenges first
@@ -25,23 +26,25 @@ def sync_default():
     progress = state["progress"]
     merged = False
 
-    pending_files = sorted(pending_dir.glob("*.yaml"))
-    if pending_files:
+    # Wait for any in-flight submit so entries aren't merged and uploaded at once
+    with locked(DRAIN_LOCK):
+        pending_files = pending()
         total_xp = 0
-        completed = set(progress.get("completed", []))
+        completed = CompletionSet.from_ids(progress.get("completed", []))
 
-        for f in pending_files:
+        for entry in pending_files:
             try:
-                data = yaml.safe_load(f.read_text())
-                total_xp += int(data.get("xp", 0))
-                completed.update(data.get("completed", []))
-                f.unlink(missing_ok=True)
+                total_xp += int(entry.snapshot.get("xp", 0))
+                completed |= from_payload(entry.snapshot)
             except Exception as e:
-                console.print(f"[yellow]⚠️ Skipped invalid sync file {f.name}: {e}[/yellow]")
+                console.print(f"[yellow]⚠️ Skipped invalid queued snapshot {label(entry)}: {e}[/yellow]")
+        ack(pending_files, delivered=False)  # merged locally, not sent
+        compact_if_needed()
 
+    if pending_files:
         if total_xp > 0 or completed:
             player["xp"] = player.get("xp", 0) + total_xp
-            progress["completed"] = sorted(list(completed))
+            progress["completed"] = completed.ids()
 
             # Simple XP → rank promotion
             rank_thresholds = {
@@ -58,7 +61,7 @@ def sync_default():
 
             save_state(state)
             merged = True
-            console.print(f"✅ Merged {len(pending_files)} pending file(s) → +{total_xp} XP")
+            console.print(f"✅ Merged {len(pending_files)} pending snapshot(s) → +{total_xp} XP")
     else:
         console.print("[dim]No pending XP updates found.[/dim]")
 
@@ -81,6 +84,7 @@ def sync_default():
             new += 1
         else:
             if src.stat().st_mtime > dest.stat().st_mtime:
+                dest.unlink()  # may be read-only (frozen by older releases) or hardlinked
                 shutil.copy2(src, dest)
                 updated += 1
 
@@ -1,26 +1,30 @@
 from pathlib import Path
 import yaml, requests
 from rich.console import Console
+from .locking import DRAIN_LOCK, locked
+from .syncqueue import ack, unsent
 
 console = Console()
 
 def submit_to_issue():
     """Submit leaderboard progress to GitHub Issues (no token needed)."""
+    with locked(DRAIN_LOCK, blocking=False) as acquired:
+        if not acquired:
+            console.print("[dim]⏭️ Another devopsmind process is already submitting.[/dim]")
+            return
+        _submit_to_issue()
+
+
+def _submit_to_issue():
     repo = "InfraForgeLabs/DevOpsMind"
-    pending_dir = Path.home() / ".devopsmind" / ".pending_sync"
-    files = list(pending_dir.glob("*.yaml"))
+    entries = unsent()
 
-    if not files:
+    if not entries:
         console.print("[yellow]⚠️ No pending leaderboard entries found.[/yellow]")
         return
 
-    for f in files:
-        try:
-            data = yaml.safe_load(f.read_text())
-        except Exception as e:
-            console.print(f"[red]❌ Failed to read {f.name}: {e}[/red]")
-            continue
-
+    for entry in entries:
+        data = entry.snapshot
         gamer = data.get("gamer", "unknown")
         title = f"Leaderboard submission: {gamer}"
 
@@ -43,7 +47,7 @@ def submit_to_issue():
             resp = requests.post(url, json=payload, timeout=10)
             if resp.status_code in (200, 201):
                 console.print(f"✅ Submitted successfully! View on GitHub → https://github.com/{repo}/issues")
-                f.unlink()  # delete after submit
+                ack([entry])  # drop from the queue after submit
             else:
                 console.print(f"[red]❌ Failed (HTTP {resp.status_code})[/red]")
                 console.print(resp.text)
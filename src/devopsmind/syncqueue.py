@@ -0,0 +1,283 @@
+from __future__ import annotations
+from pathlib import Path
+from collections import namedtuple
+import hashlib, json, os, zlib
+from typing import Dict, Any, List, Iterable, Tuple
+
+from .locking import DRAIN_LOCK, QUEUE_LOCK, locked
+
+# ---------------------------------------------------------
+# Constants
+# ---------------------------------------------------------
+BASE_DIR = Path.home() / ".devopsmind"
+PENDING_SYNC_DIR = BASE_DIR / ".pending_sync"  # legacy one-file-per-snapshot queue
+LOG_FILE = BASE_DIR / "sync_queue.log"
+CURSOR_FILE = BASE_DIR / "sync_queue.cursor"
+COMPACT_BYTES = 256 * 1024
+
+# seq is the record's byte offset in the log; stable until the next compaction
+Entry = namedtuple("Entry", "seq key snapshot")
+
+
+def player_key(data: Dict[str, Any]) -> str:
+    """Identity a snapshot belongs to: email if known, else gamer tag / profile name."""
+    email = str(data.get("email") or "").strip().lower()
+    return email or str(data.get("gamer") or data.get("name") or data.get("username") or "player")
+
+
+def label(entry: Entry) -> str:
+    """Short human-readable name for messages, e.g. 'g#1024'."""
+    snap = entry.snapshot
+    return f"{snap.get('gamer') or snap.get('name') or 'player'}#{entry.seq}"
+
+
+def content_digest(snapshot: Dict[str, Any]) -> str:
+    """sha256 of a snapshot's canonical JSON, ignoring its timestamp."""
+    body = {k: v for k, v in snapshot.items() if k != "timestamp"}
+    return hashlib.sha256(json.dumps(body, sort_keys=True, separators=(",", ":"), default=str).encode()).hexdigest()
+
+
+# ---------------------------------------------------------
+# Log Records: "<crc32 hex> <json>\n"
+# ---------------------------------------------------------
+def _encode(key: str, snapshot: Dict[str, Any]) -> bytes:
+    body = json.dumps({"key": key, "snapshot": snapshot}, sort_keys=True, separators=(",", ":"))
+    return f"{zlib.crc32(body.encode()):08x} {body}\n".encode()
+
+
+def _records(data: bytes, start: int = 0) -> Iterable[Tuple[int, int, Dict[str, Any] | None]]:
+    """Yield (seq, end, record) from `start`; record is None if its checksum fails."""
+    pos = start
+    while pos < len(data):
+        nl = data.find(b"\n", pos)
+        if nl < 0:
+            return  # torn write at the tail: ignore until it is complete
+        line = data[pos:nl]
+        rec = None
+        try:
+            crc, body = line.split(b" ", 1)
+            if int(crc, 16) == zlib.crc32(body):
+                rec = json.loads(body)
+        except ValueError:
+            pass
+        yield pos, nl + 1, rec
+        pos = nl + 1
+
+
+def _read_cursor() -> Dict[str, Any]:
+    try:
+        cur = json.loads(CURSOR_FILE.read_text())
+        return {"offset": int(cur.get("offset", 0)), "acked": dict(cur.get("acked", {}))}
+    except Exception:
+        return {"offset": 0, "acked": {}}
+
+
+def _write_cursor(cur: Dict[str, Any]):
+    tmp = CURSOR_FILE.with_name(f".{CURSOR_FILE.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(cur))
+    os.replace(tmp, CURSOR_FILE)
+
+
+def _append(records: List[bytes]) -> List[int]:
+    """Append whole records with one O_APPEND write; call under QUEUE_LOCK."""
+    BASE_DIR.mkdir(parents=True, exist_ok=True)
+    fd = os.open(LOG_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        pos = os.lseek(fd, 0, os.SEEK_END)
+        seqs = []
+        for r in records:
+            seqs.append(pos)
+            pos += len(r)
+        os.write(fd, b"".join(records))
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    return seqs
+
+
+# ---------------------------------------------------------
+# Producer Side
+# ---------------------------------------------------------
+def enqueue(snapshot: Dict[str, Any]) -> Entry:
+    """Append a cumulative snapshot to the log; older ones for the player become superseded."""
+    key = player_key(snapshot)
+    with locked(QUEUE_LOCK):
+        seq = _append([_encode(key, snapshot)])[0]
+    if seq >= COMPACT_BYTES:
+        with locked(DRAIN_LOCK, blocking=False) as acquired:
+            if acquired:
+                compact()
+    return Entry(seq, key, snapshot)
+
+
+def _import_legacy():
+    """Move snapshots queued as .pending_sync/*.yaml by older releases into the log."""
+    files = sorted(PENDING_SYNC_DIR.glob("*.yaml"), key=lambda f: (f.stat().st_mtime_ns, f.name)) \
+        if PENDING_SYNC_DIR.exists() else []
+    if not files:
+        return
+    import yaml
+
+    records = []
+    for f in files:
+        try:
+            data = yaml.safe_load(f.read_text())
+        except Exception:
+            continue
+        if isinstance(data, dict):
+            records.append(_encode(player_key(data), data))
+    with locked(QUEUE_LOCK):
+        if records:
+            _append(records)
+        for f in files:
+            f.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------
+# Consumer Side (call with DRAIN_LOCK held)
+# ---------------------------------------------------------
+def _scan() -> Tuple[Dict[str, Any], bytes, Dict[str, Entry]]:
+    cur = _read_cursor()
+    try:
+        data = LOG_FILE.read_bytes()
+    except FileNotFoundError:
+        data = b""
+    if cur["offset"] > len(data):
+        cur = {"offset": 0, "acked": {}}  # log was replaced behind our back; start over
+
+    newest: Dict[str, Entry] = {}
+    for seq, _, rec in _records(data, cur["offset"]):
+        if rec is None or seq <= cur["acked"].get(rec["key"], -1):
+            continue
+        newest[rec["key"]] = Entry(seq, rec["key"], rec["snapshot"])
+    return cur, data, newest
+
+
+def pending() -> List[Entry]:
+    """Unacknowledged snapshots, coalesced to the newest one per player, oldest first."""
+    _import_legacy()
+    return sorted(_scan()[2].values())
+
+
+def unsent() -> List[Entry]:
+    """
+    pending(), minus snapshots whose content (timestamp aside) the relay has
+    already acknowledged; those are acked locally instead of being re-uploaded.
+    """
+    entries = pending()
+    if not entries:
+        return entries
+    from . import store
+
+    digests = [content_digest(e.snapshot) for e in entries]
+    try:
+        sent = store.already_sent(digests)
+    except Exception:
+        return entries
+    dupes = [e for e, d in zip(entries, digests) if d in sent]
+    if dupes:
+        ack(dupes)
+    return [e for e, d in zip(entries, digests) if d not in sent]
+
+
+def ack(entries: Iterable[Entry], delivered: bool = True):
+    """
+    Mark entries (and everything older for the same player) as done and advance
+    the cursor past the fully-acknowledged prefix of the log (compact_if_needed()
+    reclaims it once the drain is over). When the entries
+    were delivered to the relay, their content digests go into the sent ledger
+    and the profile's sync watermark moves up, so the next snapshot only
+    carries completions made after them.
+    """
+    entries = list(entries)
+    cur, data, _ = _scan()
+    for e in entries:
+        cur["acked"][e.key] = max(cur["acked"].get(e.key, -1), e.seq)
+
+    offset = cur["offset"]
+    for seq, end, rec in _records(data, offset):
+        if rec is not None and seq > cur["acked"].get(rec["key"], -1):
+            break
+        offset = end
+    cur["offset"] = offset
+    _write_cursor(cur)
+
+    if delivered:
+        _record_delivery(entries)
+
+
+def _record_delivery(entries: List[Entry]):
+    if not entries:
+        return
+    from . import store
+
+    try:
+        store.record_sent([content_digest(e.snapshot) for e in entries])
+        snaps = [e.snapshot for e in entries if "seq" in e.snapshot and e.snapshot.get("name")]
+        source = store.install_id() if snaps else None
+        for snap in snaps:
+            if snap.get("source") == source:
+                store.mark_synced(snap["name"], snap["seq"])
+    except Exception:
+        pass  # a missed record only costs a re-send or a larger next delta
+
+
+def compact_if_needed():
+    """
+    Compact once the acknowledged prefix is big enough to matter. Call at the
+    end of a drain, still under DRAIN_LOCK: compaction renumbers every Entry.seq,
+    so it must never run while a caller still holds entries to ack.
+    """
+    cur = _read_cursor()
+    try:
+        size = LOG_FILE.stat().st_size
+    except FileNotFoundError:
+        return
+    offset = cur["offset"]
+    if offset >= COMPACT_BYTES or (offset and offset * 2 >= size):
+        compact()
+
+
+def compact():
+    """Rewrite the log keeping only the newest unacknowledged record per player."""
+    with locked(QUEUE_LOCK):
+        cur, data, newest = _scan()
+        if not data:
+            return
+        keep = sorted(newest.values())
+        tmp = LOG_FILE.with_name(f".{LOG_FILE.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(b"".join(_encode(e.key, e.snapshot) for e in keep))
+        os.replace(tmp, LOG_FILE)
+        _write_cursor({"offset": 0, "acked": {}})
+
+
+# ---------------------------------------------------------
+# Manual Export (scripts/sync_pending_to_repo.sh)
+# ---------------------------------------------------------
+def export(dest: Path) -> List[Path]:
+    """
+    Write each pending snapshot to `dest` as <sha256>.yaml, the layout the
+    leaderboard builder reads from leaderboard/submissions. Nothing is acked:
+    the relay dedups by digest, so a later `devopsmind submit` is harmless.
+    """
+    import yaml
+
+    dest.mkdir(parents=True, exist_ok=True)
+    with locked(DRAIN_LOCK):
+        entries = pending()
+    written = []
+    for e in entries:
+        text = yaml.safe_dump(e.snapshot, sort_keys=False)
+        out = dest / f"{hashlib.sha256(text.encode()).hexdigest()}.yaml"
+        out.write_text(text)
+        written.append(out)
+    return written
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3 or sys.argv[1] != "--export":
+        sys.exit("usage: python -m devopsmind.syncqueue --export DIR")
+    for path in export(Path(sys.argv[2])):
+        print(path)
@@ -0,0 +1,215 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import gzip, json, os, random, threading, time
+from typing import Dict, Any, Callable, Iterable, List
+from urllib.parse import urlsplit
+
+from .net import POOL_SIZE, session
+
+# ---------------------------------------------------------
+# Constants
+# ---------------------------------------------------------
+DEFAULT_WORKERS = 4
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_S = 0.5
+BACKOFF_CAP_S = 30.0
+TIMEOUT = (3.05, 10)  # (connect, read) seconds
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+GZIP_MIN_BYTES = 256  # smaller bodies are not worth the gzip header
+
+_gzip_origins: set | None = None  # relays that advertised Accept-Encoding: gzip
+_gzip_changed = False
+_gzip_lock = threading.Lock()
+
+
+def _upload_jobs() -> int:
+    """DEVOPSMIND_UPLOAD_JOBS, or the default if unset or not a number; never more than the pool."""
+    try:
+        jobs = int(os.getenv("DEVOPSMIND_UPLOAD_JOBS", DEFAULT_WORKERS))
+    except ValueError:
+        jobs = DEFAULT_WORKERS
+    return max(1, min(jobs, POOL_SIZE))
+
+
+MAX_WORKERS = _upload_jobs()
+
+
+@dataclass
+class Upload:
+    url: str
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Outcome:
+    item: Any
+    ok: bool
+    status: int | None = None
+    reply: Dict[str, Any] = field(default_factory=dict)
+    error: str = ""
+    attempts: int = 0
+
+
+# ---------------------------------------------------------
+# Backoff
+# ---------------------------------------------------------
+def retry_after(resp) -> float | None:
+    """Seconds to wait according to a Retry-After header (delta-seconds or HTTP date)."""
+    value = resp.headers.get("Retry-After") if resp is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2^attempt))."""
+    return random.uniform(0, min(BACKOFF_CAP_S, BACKOFF_BASE_S * 2 ** attempt))
+
+
+# ---------------------------------------------------------
+# Request Compression (RFC 7694: the relay lists Accept-Encoding in its replies)
+# ---------------------------------------------------------
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _load_gzip():
+    """Read the remembered origins from the store (call from the store's thread)."""
+    global _gzip_origins
+    if _gzip_origins is None:
+        try:
+            from . import store
+            _gzip_origins = set(json.loads(store.get_meta("gzip_origins", "[]")))
+        except Exception:
+            _gzip_origins = set()
+
+
+def _save_gzip():
+    global _gzip_changed
+    if _gzip_changed:
+        try:
+            from . import store
+            store.set_meta("gzip_origins", json.dumps(sorted(_gzip_origins)))
+            _gzip_changed = False
+        except Exception:
+            pass
+
+
+def gzip_supported(url: str) -> bool:
+    with _gzip_lock:
+        return _origin(url) in (_gzip_origins or ())
+
+
+def _learn_gzip(url: str, supported: bool):
+    """Note whether the relay at url accepts gzip request bodies (saved by send_all)."""
+    global _gzip_changed
+    origin = _origin(url)
+    with _gzip_lock:
+        known = _gzip_origins if _gzip_origins is not None else set()
+        if (origin in known) != supported:
+            (known.add if supported else known.discard)(origin)
+            _gzip_changed = True
+
+
+def _encode(up: Upload) -> tuple:
+    if len(up.body) < GZIP_MIN_BYTES or not gzip_supported(up.url):
+        return up.body, up.headers, False
+    return gzip.compress(up.body), {**up.headers, "Content-Encoding": "gzip"}, True
+
+
+# ---------------------------------------------------------
+# Sending
+# ---------------------------------------------------------
+def _send(item: Any, up: Upload, offline: threading.Event) -> Outcome:
+    import requests
+
+    out = Outcome(item, False)
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        if offline.is_set():
+            out.error = out.error or "offline"
+            return out
+        out.attempts = attempt
+        wait = backoff(attempt)
+        body, headers, zipped = _encode(up)
+        try:
+            resp = session().post(up.url, data=body, headers=headers, timeout=TIMEOUT)
+            if zipped and resp.status_code == 415:
+                # Relay no longer takes gzip: resend as-is within the same attempt
+                _learn_gzip(up.url, False)
+                resp = session().post(up.url, data=up.body, headers=up.headers, timeout=TIMEOUT)
+        except requests.exceptions.ConnectionError as e:
+            out.status, out.error = None, f"connection failed: {e}"
+            if attempt == MAX_ATTEMPTS:
+                offline.set()  # stop the remaining uploads from waiting out their own retries
+        except requests.exceptions.RequestException as e:
+            out.status, out.error = None, str(e)
+        else:
+            out.status = resp.status_code
+            if 200 <= resp.status_code < 300:
+                _learn_gzip(up.url, "gzip" in resp.headers.get("Accept-Encoding", "").lower())
+            try:
+                out.reply = resp.json() if resp.content else {}
+            except ValueError:
+                out.reply = {}
+            if 200 <= resp.status_code < 300 and out.reply.get("ok"):
+                out.ok, out.error = True, ""
+                return out
+            out.error = str(out.reply.get("error") or f"HTTP {resp.status_code}")
+            if resp.status_code not in RETRY_STATUS:
+                return out  # the relay answered; retrying the same body won't change that
+            hinted = retry_after(resp)
+            if hinted is not None:
+                wait = hinted
+        if attempt < MAX_ATTEMPTS:
+            time.sleep(min(wait, BACKOFF_CAP_S))
+    return out
+
+
+def send_all(
+    items: Iterable[Any],
+    build: Callable[[Any], Upload],
+    on_result: Callable[[Outcome], None] | None = None,
+    jobs: int | None = None,
+) -> List[Outcome]:
+    """
+    POST every item over the shared keep-alive session with at most `jobs`
+    requests in flight, retrying each with jittered backoff. on_result is
+    called in this thread as each item finishes; outcomes come back in input order.
+    """
+    items = list(items)
+    if not items:
+        return []
+    _load_gzip()
+    offline = threading.Event()
+    outcomes: Dict[int, Outcome] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs or MAX_WORKERS, POOL_SIZE, len(items)))) as pool:
+        futures = {}
+        for i, item in enumerate(items):
+            try:
+                futures[pool.submit(_send, item, build(item), offline)] = i
+            except Exception as e:
+                outcomes[i] = Outcome(item, False, error=f"could not build request: {e}")
+                if on_result:
+                    on_result(outcomes[i])
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                outcomes[i] = fut.result()
+            except Exception as e:
+                outcomes[i] = Outcome(items[i], False, error=str(e))
+            if on_result:
+                on_result(outcomes[i])
+    _save_gzip()
+    return [outcomes[i] for i in range(len(items))]
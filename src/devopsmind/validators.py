@@ -0,0 +1,80 @@
+from __future__ import annotations
+from pathlib import Path
+import hashlib, importlib.util, inspect, marshal, os, sys, types
+from typing import Dict, Any, Tuple
+
+# ---------------------------------------------------------
+# Constants
+# ---------------------------------------------------------
+CODE_CACHE_DIR = Path.home() / ".devopsmind" / "cache" / "validators"
+_MAGIC = importlib.util.MAGIC_NUMBER
+
+# (resolved path, sha256) -> loaded module
+_modules: Dict[Tuple[str, str], types.ModuleType] = {}
+
+
+# ---------------------------------------------------------
+# Compiled Code Cache (marshal on disk)
+# ---------------------------------------------------------
+def _compile(source: bytes, path: Path, digest: str):
+    """Return the code object for a validator, reusing ~/.devopsmind/cache/validators/<sha>.bin."""
+    cache_file = CODE_CACHE_DIR / f"{digest}.bin"
+    try:
+        blob = cache_file.read_bytes()
+        if blob[:len(_MAGIC)] == _MAGIC:
+            return marshal.loads(blob[len(_MAGIC):])
+    except Exception:
+        pass
+
+    code = compile(source, str(path), "exec", dont_inherit=True)
+    try:
+        CODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(_MAGIC + marshal.dumps(code))
+        os.replace(tmp, cache_file)
+    except Exception:
+        pass
+    return code
+
+
+# ---------------------------------------------------------
+# Module Loader
+# ---------------------------------------------------------
+def load_validator(path: Path):
+    """
+    Load validator.py as a module, keyed by path and content hash.
+    Each validator gets its own module name, so loading one never replaces
+    another, and an unchanged validator is executed once per process.
+    """
+    path = Path(path).resolve()
+    source = path.read_bytes()
+    digest = hashlib.sha256(source).hexdigest()
+    key = (str(path), digest)
+    if key in _modules:
+        return _modules[key]
+
+    name = "devopsmind_validator_" + hashlib.sha256(f"{path}:{digest}".encode()).hexdigest()[:16]
+    mod = types.ModuleType(name)
+    mod.__file__ = str(path)
+    sys.modules[name] = mod
+    try:
+        exec(_compile(source, path, digest), mod.__dict__)
+    except BaseException:
+        sys.modules.pop(name, None)
+        raise
+
+    _modules[key] = mod
+    return mod
+
+
+def call_validate(mod, context: Dict[str, Any] | None = None):
+    """Call mod.validate(), passing context only if the validator accepts it."""
+    sig = inspect.signature(mod.validate)
+    return mod.validate() if len(sig.parameters) == 0 else mod.validate(context or {})
+
+
+def clear():
+    """Forget every loaded validator module."""
+    for mod in _modules.values():
+        sys.modules.pop(mod.__name__, None)
+    _modules.clear()
@@ -0,0 +1,194 @@
+from __future__ import annotations
+from pathlib import Path
+import ctypes, ctypes.util, os, select, struct, sys, time
+from typing import Dict, Any, Tuple
+from rich.console import Console
+
+from .engine import (
+    WORKSPACE_ROOT,
+    get_challenge,
+    refresh_workspace,
+    validate_in,
+    _load_validator,
+    _log_session,
+)
+from .progress import record_completion
+
+console = Console()
+
+# ---------------------------------------------------------
+# Constants
+# ---------------------------------------------------------
+IGNORED_DIRS = {"__pycache__", ".pytest_cache"}
+IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE = 0x002, 0x004, 0x008
+IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x040, 0x080, 0x100, 0x200
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+def _walk_dirs(root: Path):
+    for d, dirs, _ in os.walk(root):
+        dirs[:] = [x for x in dirs if x not in IGNORED_DIRS]
+        yield Path(d)
+
+
+# ---------------------------------------------------------
+# Watchers
+# ---------------------------------------------------------
+class InotifyWatcher:
+    """Recursive inotify watch on a directory tree (Linux, via libc)."""
+
+    name = "inotify"
+
+    def __init__(self, root: Path):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        for d in _walk_dirs(root):
+            self._add(d)
+
+    def _add(self, d: Path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(d), WATCH_MASK)
+        if wd >= 0:
+            self._dirs[wd] = d
+
+    def _read(self) -> bool:
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        changed = False
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _, length = _EVENT.unpack_from(buf, offset)
+            name = buf[offset + _EVENT.size: offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            name = os.fsdecode(name)
+            if name in IGNORED_DIRS or wd not in self._dirs:
+                continue
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                for d in _walk_dirs(self._dirs[wd] / name):
+                    self._add(d)
+            changed = True
+        return changed
+
+    def wait(self, timeout: float | None) -> bool:
+        """Block until something changes (True) or timeout elapses (False)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        return bool(ready) and self._read()
+
+    def drain(self):
+        while self._read():
+            pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback watcher comparing (mtime, size) snapshots of the tree."""
+
+    name = "polling"
+
+    def __init__(self, root: Path, interval: float = 0.5):
+        self.root = root
+        self.interval = interval
+        self._snap = self._snapshot()
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snap = {}
+        for d in _walk_dirs(self.root):
+            for f in os.scandir(d):
+                try:
+                    st = f.stat(follow_symlinks=False)
+                    snap[f.path] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    pass
+        return snap
+
+    def wait(self, timeout: float | None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snap = self._snapshot()
+            if snap != self._snap:
+                self._snap = snap
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.interval if deadline is None else min(self.interval, max(0.0, deadline - time.monotonic())))
+
+    def drain(self):
+        self._snap = self._snapshot()
+
+    def close(self):
+        pass
+
+
+def make_watcher(root: Path, polling: bool = False):
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except Exception:
+            pass
+    return PollingWatcher(root)
+
+
+# ---------------------------------------------------------
+# Watch Loop
+# ---------------------------------------------------------
+def watch(ch_id: str, context: Dict[str, Any] | None = None, sandbox: bool = False,
+          debounce_ms: int = 300, polling: bool = False):
+    """
+    Re-validate a challenge whenever its workspace changes.
+    Fixtures are refreshed once at start; afterwards only the validator runs,
+    with the challenge record and validator module kept loaded.
+    """
+    ch = get_challenge(ch_id)
+    if not ch:
+        console.print(f"[red]❌ Challenge not found: {ch_id}[/red]")
+        return
+    mod = None if sandbox else _load_validator(ch.path)
+    if not (ch.path / "validator.py").exists() or not (sandbox or mod):
+        console.print(f"[red]❌ Validator missing for {ch.id}[/red]")
+        return
+
+    workspace_dir = WORKSPACE_ROOT / ch.id
+    workspace_dir.mkdir(parents=True, exist_ok=True)
+    if ch.path.exists():
+        refresh_workspace(ch.path, workspace_dir, ch.readonly)
+
+    watcher = make_watcher(workspace_dir, polling)
+    console.print(f"👀 Watching {workspace_dir} ({watcher.name}). Press Ctrl+C to stop.\n")
+    recorded = False
+
+    def run_once():
+        nonlocal recorded
+        start = time.perf_counter()
+        ok, msg = validate_in(ch, mod, workspace_dir, context, sandbox, use_cache=False)
+        took = (time.perf_counter() - start) * 1000
+        stamp = time.strftime("%H:%M:%S")
+        if ok:
+            console.print(f"[green]{stamp} ✅ {msg}[/green] [dim]({took:.0f} ms)[/dim]")
+            if not recorded:
+                _log_session(ch.id, msg, True, ch.xp)
+                record_completion(ch.id, ch.xp)
+                recorded = True
+        else:
+            console.print(f"[red]{stamp} ❌ {msg}[/red] [dim]({took:.0f} ms)[/dim]")
+        watcher.drain()  # ignore files the validator itself wrote
+
+    try:
+        run_once()
+        while True:
+            if not watcher.wait(None):
+                continue
+            while watcher.wait(debounce_ms / 1000):
+                pass  # debounce bursts of writes (editor saves, git checkouts)
+            run_once()
+    except KeyboardInterrupt:
+        console.print("\n👋 Stopped watching.")
+    finally:
+        watcher.close()